@@ -1,69 +1,120 @@
-from datetime import datetime
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.graph.state import CompiledStateGraph
-from mem0 import Memory
-from qdrant_client import QdrantClient
 
-from app.agent.langgraph_agent import get_graph, create_initial_state
+from app.agent.langgraph_agent import AnswerStream, create_initial_state, get_graph, select_response
 from app.core.config import settings
+from app.services.memory_batcher import MemoryBatcher
+from app.services.summarizer import ConversationSummarizer
 from app.services.vector_store import MultiTenantVectorStore
 from app.utils.logger import setup_logger
+from app.utils.memory_selection import select_memories
+from app.utils.qdrant import (
+    check_vector_size,
+    ensure_collection_alias,
+    resolve_collection_name,
+    sync_collection_storage,
+)
+from app.utils.single_flight import SingleFlight, normalize_question
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
 
 logger = setup_logger(__name__)
 
 
+def build_context(memories: List[Dict[str, Any]], summary: Optional[str], turns: List[Dict[str, Any]]) -> str:
+    """Build the context block of the system prompt.
+
+    Args:
+        memories: mem0 search results
+        summary: Rolling summary of the chat's older turns, if any
+        turns: Chat turns not covered by the summary, oldest first
+
+    Returns:
+        Context text
+    """
+    context = "Relevant information from previous conversations:\n"
+    for memory in memories:
+        context += f" - {memory['memory']}\n"
+
+    if summary:
+        context += f"\nSummary of the earlier conversation:\n{summary}\n"
+
+    if turns:
+        context += "\nRelevant chat history:\n"
+        for doc in turns:
+            question_text = doc.get("user_message", "")
+            answer_text = doc.get("assistant_message", "")
+
+            context += f" - User: {question_text}\n"
+            context += f" - Assistant: {answer_text}\n"
+
+    return context
+
+
 class AISupport:
     _instance = None
+    _pid = None
 
     def __new__(cls, vector_store: MultiTenantVectorStore):
-        if cls._instance is None:
+        # One instance per process: forked workers must not reuse the parent's clients.
+        if cls._instance is None or cls._pid != os.getpid():
             cls._instance = super(AISupport, cls).__new__(cls)
             cls._instance._initialized = False
+            cls._pid = os.getpid()
         return cls._instance
 
     def __init__(self, vector_store: MultiTenantVectorStore):
         """
         Initialize the AI Support with Memory Configuration and Langchain OpenAI Chat Model.
         """
-        if not hasattr(self, '_initialized') or not self._initialized:
-            self._initialized = True
+        if self._initialized:
+            return
 
         custom_prompt = """
                 Please extract relevant entities containing user information, preferences, context, and important facts that would help personalize future interactions. 
                 Here are some few shot examples:
 
                 Input: Hi.
-                Output: {{"facts" : []}}
+                Output: {"facts" : []}
 
                 Input: The weather is nice today.
-                Output: {{"facts" : []}}
+                Output: {"facts" : []}
 
                 Input: I'm a software developer working on Python projects and I prefer using FastAPI.
-                Output: {{"facts" : ["User is a software developer", "Works with Python", "Prefers FastAPI framework"]}}
+                Output: {"facts" : ["User is a software developer", "Works with Python", "Prefers FastAPI framework"]}
 
                 Input: My name is John Smith, I live in New York and I'm interested in machine learning.
-                Output: {{"facts" : ["User name: John Smith", "Lives in New York", "Interested in machine learning"]}}
+                Output: {"facts" : ["User name: John Smith", "Lives in New York", "Interested in machine learning"]}
 
                 Input: I usually work late hours and prefer getting notifications in the evening.
-                Output: {{"facts" : ["Works late hours", "Prefers evening notifications"]}}
+                Output: {"facts" : ["Works late hours", "Prefers evening notifications"]}
 
                 Input: I have experience with React and Node.js, but I'm new to TypeScript.
-                Output: {{"facts" : ["Experienced with React", "Experienced with Node.js", "New to TypeScript"]}}
+                Output: {"facts" : ["Experienced with React", "Experienced with Node.js", "New to TypeScript"]}
 
                 Input: I'm planning a trip to Japan next month and need help with travel recommendations.
-                Output: {{"facts" : ["Planning trip to Japan", "Trip scheduled for next month", "Needs travel recommendations"]}}
+                Output: {"facts" : ["Planning trip to Japan", "Trip scheduled for next month", "Needs travel recommendations"]}
 
                 Input: I'm a vegetarian and I'm allergic to nuts.
-                Output: {{"facts" : ["User is vegetarian", "Allergic to nuts"]}}
+                Output: {"facts" : ["User is vegetarian", "Allergic to nuts"]}
 
                 Input: I prefer dark mode interfaces and I use VS Code as my main editor.
-                Output: {{"facts" : ["Prefers dark mode interfaces", "Uses VS Code editor"]}}
+                Output: {"facts" : ["Prefers dark mode interfaces", "Uses VS Code editor"]}
 
                 Return the facts and user information in a json format as shown above.
                 """
 
-        client = QdrantClient(settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+        from mem0 import AsyncMemory
+        from mem0.configs.base import MemoryConfig
+        # The vector store's client, so mem0 and chat history share one connection pool.
+        client = vector_store.client
+        memory_collection = resolve_collection_name(client, settings.MEMORY_COLLECTION_NAME)
+        if client.collection_exists(memory_collection):
+            check_vector_size(client, memory_collection, settings.EMBEDDING_DIMS)
 
         config = {
             "llm": {
@@ -78,27 +129,41 @@ class AISupport:
             "embedder": {
                 "provider": "openai",
                 "config": {
-                    "model": "text-embedding-3-small",
-                    "embedding_dims": 768,
+                    "model": settings.EMBEDDING_MODEL,
+                    "embedding_dims": settings.EMBEDDING_DIMS,
                     "api_key": settings.OPENAI_API_KEY
                 }
             },
             "vector_store": {
                 "provider": "qdrant",
                 "config": {
-                    "collection_name": "general_chat_history",
-                    "embedding_model_dims": 768,
-                    "client": client
+                    "collection_name": memory_collection,
+                    "embedding_model_dims": settings.EMBEDDING_DIMS,
+                    "client": client,
+                    "on_disk": settings.QDRANT_VECTORS_ON_DISK
                 }
             },
-            "custom_prompt": custom_prompt,
+            "custom_fact_extraction_prompt": custom_prompt,
             "version": "v1.1",
         }
 
-        self.__memory = Memory.from_config(config)
+        memory_collection_exists = client.collection_exists(memory_collection)
+        # AsyncMemory runs mem0's blocking LLM, embedding and Qdrant calls in worker threads.
+        self.__memory = AsyncMemory(MemoryConfig(**config))
+        # mem0 only knows on_disk; quantization, HNSW and payload storage are applied afterwards.
+        sync_collection_storage(
+            client,
+            memory_collection,
+            apply=not memory_collection_exists or settings.QDRANT_SYNC_STORAGE_ON_START
+        )
+        ensure_collection_alias(client, settings.MEMORY_COLLECTION_NAME, memory_collection)
         self.__app_id = "AI-general-chatbot"
+        self.__memory_batcher = MemoryBatcher(self.__memory, metadata={"app_id": self.__app_id})
         self.__vector_store = vector_store
-        self.__graph: CompiledStateGraph = get_graph()
+        self.__graph: "CompiledStateGraph" = get_graph()
+        self.__single_flight = SingleFlight("ask")
+        self.__summarizer = ConversationSummarizer(vector_store)
+        self._initialized = True
 
     async def ask(self, question: str, user_id: str, chat_id: str, tenant_id: str) -> dict:
         """Process a user question and return an AI response.
@@ -112,41 +177,57 @@ class AISupport:
         Returns:
             Dictionary containing the AI response messages
         """
+        # Identical turns already running (double submits, retries) share one graph run and one write.
+        key = (tenant_id, user_id, chat_id, normalize_question(question))
+        return await self.__single_flight.do(
+            key, lambda: self.__ask(question, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
+        )
+
+    @staticmethod
+    def __thread_config(user_id: str, chat_id: str) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": f"user_{user_id}_chat_{chat_id}",
+                "user_id": user_id,
+                "chat_id": chat_id
+            }
+        }
+
+    async def __prepare(
+        self, question: str, user_id: str, chat_id: str, tenant_id: str
+    ) -> Tuple[Dict[str, Any], RunnableConfig]:
+        """Build the graph input for a question: system prompt with memories, summary and recent turns."""
         logger.info("Self ID: {}".format(id(self)))
 
         memories = await self.__search_memory(question, user_id=user_id)
 
-        relevant_docs = self.__vector_store.get_chat_by_id(
-            chat_id=chat_id, 
-            user_id=user_id, 
+        # Older turns are covered by the rolling summary; only the turns after it are sent verbatim.
+        summary, relevant_docs = self.__vector_store.get_chat_context(
+            chat_id=chat_id,
+            user_id=user_id,
             tenant_id=tenant_id
         )
         logger.info(f"Retrieved {relevant_docs}")
 
-        context = "Relevant information from previous conversations:\n"
-        if memories['results']:
-            for memory in memories['results']:
-                context += f" - {memory['memory']}\n"
-        
-        if relevant_docs:
-            context += "\nRelevant chat history:\n"
-            for i, doc in enumerate(relevant_docs):
-                question_text = doc.get("user_message", "")
-                answer_text = doc.get("assistant_message", "")
-
-                context += f" - User: {question_text}\n"
-                context += f" - Assistant: {answer_text}\n"
-
+        history_texts = [f"{doc['user_message']}\n{doc['assistant_message']}" for doc in relevant_docs]
+        if summary:
+            history_texts.append(summary["summary"])
+        selected_memories, memory_stats = select_memories(
+            memories['results'],
+            history_texts,
+            score_threshold=settings.MEMORY_SCORE_THRESHOLD,
+            duplicate_similarity=settings.MEMORY_DUPLICATE_SIMILARITY,
+            max_tokens=settings.MEMORY_MAX_TOKENS
+        )
+        logger.info(f"Memory retrieval for user {user_id}, chat {chat_id}: {memory_stats}")
 
-        thread_id = f"user_{user_id}_chat_{chat_id}"
+        context = build_context(
+            memories=selected_memories,
+            summary=summary["summary"] if summary else None,
+            turns=relevant_docs
+        )
 
-        config: RunnableConfig = {
-            "configurable": {
-                "thread_id": thread_id,
-                "user_id": user_id,
-                "chat_id": chat_id
-            }
-        }
+        config = self.__thread_config(user_id, chat_id)
         messages = [
             SystemMessage(content=f"""You are a helpful, knowledgeable, and versatile AI assistant designed to provide accurate and thoughtful responses on a wide range of topics.
                 CAPABILITIES:
@@ -170,38 +251,84 @@ class AISupport:
             HumanMessage(content=question)
         ]
 
-        initial_state = create_initial_state(messages, max_iterations=1)
-        response_state = await self.__graph.ainvoke(initial_state, config=config)
-
-        response_content = ""
-        if "direct_response" in response_state:
-            response_content = response_state["direct_response"]
-            logger.info("Using direct response from supervisor")
-        elif "messages" in response_state and response_state["messages"]:
-            for msg in reversed(response_state["messages"]):
-                if isinstance(msg, AIMessage) and hasattr(msg, "name") and msg.name in ["Researcher", "Scrapper", "Supervisor"]:
-                    response_content = msg.content
-                    logger.info(f"Using agent response from {msg.name}")
-                    break
+        return create_initial_state(messages, max_iterations=1), config
 
-        await self.__add_memory(question, response_content, user_id=user_id)
+    async def __finish(self, question: str, answer: str, user_id: str, chat_id: str, tenant_id: str) -> None:
+        """Remember a completed turn: mem0 extraction, chat history and the rolling summary."""
+        await self.__add_memory(question, answer, user_id=user_id)
 
         self.__vector_store.store_conversation(
             question=question,
-            answer=response_content,
+            answer=answer,
             tenant_id=tenant_id,
             metadata={
                 "user_id": user_id,
-                "chat_id": chat_id,
-                "timestamp": str(datetime.now())
+                "chat_id": chat_id
             }
         )
+        if settings.SUMMARY_ENABLED:
+            self.__summarizer.schedule(chat_id=chat_id, tenant_id=tenant_id, user_id=user_id)
 
+    async def __ask(self, question: str, user_id: str, chat_id: str, tenant_id: str) -> dict:
+        initial_state, config = await self.__prepare(question, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
+        response_state = await self.__graph.ainvoke(initial_state, config=config)
+        response_content = select_response(response_state)
+
+        await self.__finish(question, response_content, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
         return {"messages": [response_content]}
 
+    async def ask_stream(
+        self,
+        question: str,
+        user_id: str,
+        chat_id: str,
+        tenant_id: str,
+        answer: Optional[AnswerStream] = None,
+        store: bool = True
+    ) -> AsyncIterator[str]:
+        """Like ``ask``, but yield the answer text as the graph generates it.
+
+        Used where the first words matter more than the whole answer (the voice
+        worker starts speaking on the first sentence). The turn is stored once the
+        run is over, with the text that was streamed. With ``store=False`` the run
+        leaves no trace (no graph checkpoint, history or memory) until it is passed,
+        through ``answer``, to ``commit_turn``; a speculative run is simply cancelled.
+        """
+        initial_state, config = await self.__prepare(question, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
+        graph = self.__graph if store else self.__graph.copy(update={"checkpointer": None})
+        answer = answer or AnswerStream()
+        async for event in graph.astream_events(initial_state, config=config, version="v2"):
+            delta = answer.feed(event)
+            if delta:
+                yield delta
+
+        # The stored answer is the one ask() would store. It differs from the streamed
+        # text only when the graph ended without a streamed reply (e.g. a forced finish).
+        if answer.final_state is not None:
+            final = select_response(answer.final_state)
+            if final and final != answer.text:
+                yield f"\n{final}" if answer.text else final
+            answer.text = final
+        if store:
+            await self.__finish(question, answer.text, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
+
+    async def commit_turn(self, question: str, answer: AnswerStream, user_id: str, chat_id: str, tenant_id: str) -> None:
+        """Store a finished ``ask_stream(store=False)`` run as if it had been a regular turn."""
+        if answer.final_state is not None and self.__graph.checkpointer:
+            await self.__graph.aupdate_state(
+                self.__thread_config(user_id, chat_id),
+                {"messages": answer.final_state["messages"], "next": "FINISH"},
+                as_node="Supervisor"
+            )
+        await self.__finish(question, answer.text, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id)
+
+    async def aclose(self) -> None:
+        """Flush memories that are still waiting for batched extraction."""
+        await self.__memory_batcher.flush_all()
+
     async def __add_memory(self, question, response, user_id=None):
-        self.__memory.add(f"User: {question}\nAssistant: {response}", user_id=user_id, metadata={"app_id": self.__app_id})
+        self.__memory_batcher.add_turn(user_id, question, response)
 
     async def __search_memory(self, query, user_id=None):
-        related_memories = self.__memory.search(query, user_id=user_id)
+        related_memories = await self.__memory.search(query, user_id=user_id, limit=settings.MEMORY_SEARCH_TOP_K)
         return related_memories
\ No newline at end of file
@@ -1,19 +1,19 @@
 import operator
-from typing import Annotated, TypedDict, Literal, Sequence, List, Required, Optional, Dict
+import os
+from contextlib import AsyncExitStack
+from typing import Annotated, Any, TypedDict, Literal, Sequence, List, Required, Optional, Dict, Set, TYPE_CHECKING
 
 from langchain_core.messages import BaseMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, StateGraph, START
-from langgraph.graph.state import CompiledStateGraph
-from langgraph.prebuilt import create_react_agent
+from langchain_core.utils.json import parse_partial_json
 from pydantic import BaseModel
 
 from app.core.config import settings
-from app.mcp_client.client import get_mcp_client
 from app.utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+
 logger = setup_logger(__name__)
 
 
@@ -35,6 +35,8 @@ class MCPTools:
         self.mcp_clients = []
 
     async def setup_mcp_tools(self) -> List[MCPToolSetup]:
+        from app.mcp_client.client import get_mcp_client
+
         setups = []
         all_tools = []
 
@@ -79,8 +81,12 @@ class MCPTools:
         self.mcp_clients = []
 
 
-_graph: CompiledStateGraph | None = None
+_graph: "CompiledStateGraph | None" = None
 _mcp_tools: MCPTools | None = None
+_checkpointer_stack: AsyncExitStack | None = None
+# PID of the process that built the graph. MCP sessions and checkpointer
+# connections cannot be shared with forked workers, so each worker builds its own.
+_graph_pid: int | None = None
 
 
 class AgentState(TypedDict):
@@ -125,6 +131,9 @@ async def agent_node(state, agent, name):
 
 async def supervisor_agent(state: AgentState) -> Dict:
     """Supervisor agent that decides which agent to use next."""
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_openai import ChatOpenAI
+
     messages = state["messages"]
     iterations = state["iterations"]
     max_iterations = state["max_iterations"]
@@ -223,14 +232,62 @@ async def supervisor_agent(state: AgentState) -> Dict:
 
     if result.response:
         logger.info(f"Supervisor provided direct response: {result.response[:50]}...")
-        response_dict["direct_response"] = result.response
         response_dict["messages"] = messages + [AIMessage(content=result.response, name="Supervisor")]
 
     return response_dict
 
 
-async def create_graph():
+async def create_checkpointer(exit_stack: AsyncExitStack) -> "BaseCheckpointSaver | None":
+    """Create the conversation checkpointer selected by ``GRAPH_CHECKPOINTER``.
+
+    ``memory`` keeps graph state inside the current process (single worker only),
+    ``postgres`` shares it between workers through ``CHECKPOINTER_DATABASE_URI`` and
+    ``none`` runs the graph stateless, relying on the chat history stored in Qdrant.
+    """
+    backend = settings.GRAPH_CHECKPOINTER
+    if backend == "none":
+        return None
+    if backend == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        if settings.WEB_CONCURRENCY > 1:
+            logger.warning("GRAPH_CHECKPOINTER=memory keeps graph state per worker; use postgres or none with multiple workers")
+        return MemorySaver()
+    if backend == "postgres":
+        try:
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise RuntimeError(
+                "GRAPH_CHECKPOINTER=postgres requires langgraph-checkpoint-postgres and psycopg-pool"
+            ) from e
+
+        pool = AsyncConnectionPool(
+            conninfo=settings.CHECKPOINTER_DATABASE_URI,
+            max_size=settings.DB_POOL_SIZE,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        )
+        await pool.open()
+        exit_stack.push_async_callback(pool.close)
+
+        checkpointer = AsyncPostgresSaver(pool)
+        try:
+            await checkpointer.setup()
+        except Exception as e:
+            # Workers start concurrently and race on the migrations table.
+            logger.warning(f"Checkpointer setup skipped: {str(e)}")
+        return checkpointer
+    raise ValueError(f"Unknown GRAPH_CHECKPOINTER: {backend}")
+
+
+async def create_graph(checkpointer: "BaseCheckpointSaver | None" = None):
     """Create the multi-agent workflow graph."""
+    from langchain_openai import ChatOpenAI
+    from langgraph.graph import END, StateGraph, START
+    from langgraph.prebuilt import create_react_agent
+
     llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0, api_key=settings.OPENAI_API_KEY)
 
     await _mcp_tools.setup_mcp_tools()
@@ -325,8 +382,6 @@ async def create_graph():
 
     workflow.add_edge(START, "Supervisor")
 
-    checkpointer = MemorySaver()
-
     return workflow.compile(checkpointer=checkpointer)
 
 
@@ -341,31 +396,156 @@ def create_initial_state(messages: List[BaseMessage], max_iterations: int) -> Ag
     }
 
 
+def select_response(state: Dict[str, Any]) -> str:
+    """The answer of a finished graph run: the last Supervisor or agent reply."""
+    for msg in reversed(state.get("messages") or []):
+        if isinstance(msg, AIMessage) and hasattr(msg, "name") and msg.name in ["Researcher", "Scrapper", "Supervisor"]:
+            logger.info(f"Using agent response from {msg.name}")
+            return msg.content
+    return ""
+
+
+class AnswerStream:
+    """Extracts the text of the answer from the graph's ``astream_events`` as it is generated.
+
+    The answer of a run is what ``select_response`` picks from its final state: the
+    reply of the last node that answered. Text is streamed as each model call
+    produces it, and ``text`` is the text of the last answering call, so when the
+    Supervisor responds after a Researcher or Scrapper reply, both are streamed but
+    only the Supervisor's response is the answer. The Supervisor's response is a
+    field of its structured output, decoded from the partial JSON once the output
+    routes to ``FINISH`` (a response next to a hand-off is not an answer). Agent text
+    streams as it comes; a call that turns into tool calls stops streaming and its
+    text is dropped from the answer. ``final_state`` holds the graph output once the
+    run is over.
+    """
+
+    def __init__(self):
+        self.final_state: Optional[Dict[str, Any]] = None
+        self.text = ""
+        self._answer_run: Optional[str] = None
+        self._streamed = False
+        self._supervisor_output: Dict[str, str] = {}
+        self._supervisor_emitted: Dict[str, int] = {}
+        self._tool_runs: Set[str] = set()
+
+    def _supervisor_delta(self, run_id: str, chunk) -> str:
+        output = self._supervisor_output.get(run_id, "")
+        if isinstance(chunk.content, str):
+            output += chunk.content
+        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            output += tool_chunk.get("args") or ""
+        self._supervisor_output[run_id] = output
+
+        parsed = parse_partial_json(output) if output else None
+        if not isinstance(parsed, dict) or parsed.get("next") != "FINISH":
+            return ""
+        response = parsed.get("response")
+        if not isinstance(response, str):
+            return ""
+        emitted = self._supervisor_emitted.get(run_id, 0)
+        self._supervisor_emitted[run_id] = len(response)
+        return response[emitted:]
+
+    def _agent_delta(self, run_id: str, chunk) -> str:
+        if run_id in self._tool_runs:
+            return ""
+        if getattr(chunk, "tool_call_chunks", None):
+            self._tool_runs.add(run_id)
+            if self._answer_run == run_id:
+                self._answer_run = None
+                self.text = ""
+            return ""
+        return chunk.content if isinstance(chunk.content, str) else ""
+
+    def feed(self, event: Dict[str, Any]) -> str:
+        """Consume one graph event and return the text to stream for it (often empty)."""
+        kind = event["event"]
+        if kind == "on_chain_end" and not event.get("parent_ids"):
+            self.final_state = event["data"]["output"]
+            return ""
+        if kind != "on_chat_model_stream":
+            return ""
+
+        node = event.get("metadata", {}).get("langgraph_checkpoint_ns", "").split(":")[0]
+        run_id = event["run_id"]
+        chunk = event["data"]["chunk"]
+        if node == "Supervisor":
+            delta = self._supervisor_delta(run_id, chunk)
+        elif node in ("Researcher", "Scrapper"):
+            delta = self._agent_delta(run_id, chunk)
+        else:
+            return ""
+        if not delta:
+            return ""
+
+        separator = ""
+        if self._answer_run != run_id:
+            # A later reply supersedes the answer so far
+            separator = "\n" if self._streamed else ""
+            self._answer_run = run_id
+            self.text = ""
+        self.text += delta
+        self._streamed = True
+        return separator + delta
+
+
 async def initialize_graph():
-    """Initialize the graph with MCP tools."""
+    """Initialize the graph with MCP tools for the current process."""
     global _graph
     global _mcp_tools
+    global _checkpointer_stack
+    global _graph_pid
+    if _graph_pid is not None and _graph_pid != os.getpid():
+        reset_process_state()
     if _graph is None:
         _mcp_tools = MCPTools(mcp_configs=[
-            MCPConfig(client_name="Researcher", server_url="http://127.0.0.1:7861/sse"),
-            MCPConfig(client_name="Scrapper", server_url=f"http://127.0.0.1:7860/sse") # http://127.0.0.1:7860/sse or https://mcp.firecrawl.dev/{settings.FIRECRAWL_API_KEY}/sse
+            MCPConfig(client_name="Researcher", server_url=settings.MCP_SEARCH_SERVER_URL),
+            MCPConfig(client_name="Scrapper", server_url=settings.MCP_SCRAPER_SERVER_URL) # http://127.0.0.1:7860/sse or https://mcp.firecrawl.dev/{settings.FIRECRAWL_API_KEY}/sse
         ])
-        _graph = await create_graph()
-        print("✅ LangGraph with MCP tools initialized successfully!")
+        _checkpointer_stack = AsyncExitStack()
+        checkpointer = await create_checkpointer(_checkpointer_stack)
+        _graph = await create_graph(checkpointer)
+        _graph_pid = os.getpid()
+        print(f"✅ LangGraph with MCP tools initialized successfully in process {_graph_pid}!")
     return _graph
 
 
 async def close_graph():
     """Close the graph and clean up MCP connections."""
+    global _graph
     global _mcp_tools
+    global _checkpointer_stack
     if _mcp_tools is not None:
         await _mcp_tools.cleanup()
         print("✅ LangGraph with MCP tools closed successfully!")
+    if _checkpointer_stack is not None:
+        await _checkpointer_stack.aclose()
+    _graph = None
+    _mcp_tools = None
+    _checkpointer_stack = None
+
+
+def reset_process_state() -> None:
+    """Forget graph state inherited from a parent process.
+
+    Called in a freshly forked worker: the inherited MCP sessions and
+    checkpointer connections belong to the parent, so they are dropped
+    without being closed and rebuilt by the next ``initialize_graph()``.
+    """
+    global _graph
+    global _mcp_tools
+    global _checkpointer_stack
+    global _graph_pid
+    _graph = None
+    _mcp_tools = None
+    _checkpointer_stack = None
+    _graph_pid = None
 
 
 def get_graph():
     """Get the compiled graph instance."""
-    if _graph is None:
+    if _graph is None or _graph_pid != os.getpid():
         raise RuntimeError("❌ Graph not initialized. Call initialize_graph() first.")
     return _graph
 
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import os
 import sys
 
@@ -9,6 +11,7 @@ from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RoomInputOptions,
     WorkerOptions,
     cli
@@ -16,6 +19,13 @@ from livekit.agents import (
 
 from livekit.plugins import noise_cancellation, silero, deepgram, cartesia, openai
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from app.agent.chat_agent import AISupport
+from app.agent.langgraph_agent import initialize_graph
+from app.agent.livekit_llm import LangGraphLLM
+from app.agent.speculation import SpeculativeAnswers
+from app.agent.voice_metrics import FirstAudioTracker, GreetingTimer
+from app.core.config import settings
+from app.services.vector_store import MultiTenantVectorStore
 from app.utils.logger import setup_logger
 
 load_dotenv()
@@ -37,39 +47,94 @@ class Assistant(Agent):
                 - Maintain a helpful, respectful, and friendly tone
                 - Respect user privacy and avoid making assumptions""")
 
+def prewarm(proc: JobProcess):
+    """Load what every room of this worker process shares once, before the process takes jobs.
+
+    The turn detector needs no prewarming: its model runs in the worker's shared
+    inference process, and the per-room ``MultilingualModel`` is only a handle to it.
+    """
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["vector_store"] = MultiTenantVectorStore()
+
+
+async def create_llm(ctx: JobContext):
+    """The LangGraph agent for the user in the room, or a plain LLM if the token doesn't say who it is."""
+    fallback = openai.LLM(model="gpt-4o-mini")
+    participant = await ctx.wait_for_participant()
+    identity = json.loads(participant.metadata or "{}")
+    if not identity.get("tenant_id") or not identity.get("user_id"):
+        logger.warning(f"Participant {participant.identity} has no user metadata; answering without memory")
+        return fallback
+
+    async def create_support() -> AISupport:
+        await initialize_graph()
+        support = AISupport(ctx.proc.userdata["vector_store"])
+        ctx.add_shutdown_callback(support.aclose)
+        return support
+
+    # Connecting the MCP tools happens while the session starts and greets.
+    support = asyncio.create_task(create_support())
+    chat_id = f"voice-{ctx.room.name}-{ctx.job.id}"
+    speculation = None
+    if settings.VOICE_SPECULATION:
+        speculation = SpeculativeAnswers(
+            support,
+            user_id=identity["user_id"],
+            chat_id=chat_id,
+            tenant_id=identity["tenant_id"],
+            stable_seconds=settings.VOICE_SPECULATION_STABLE_SECONDS,
+            max_concurrent=settings.VOICE_SPECULATION_MAX_CONCURRENT
+        )
+
+        async def close_speculation() -> None:
+            speculation.close()
+        ctx.add_shutdown_callback(close_speculation)
+
+    return LangGraphLLM(
+        support,
+        tenant_id=identity["tenant_id"],
+        user_id=identity["user_id"],
+        chat_id=chat_id,
+        fallback=fallback,
+        speculation=speculation
+    )
+
+
 async def entrypoint(ctx: JobContext):
+    greeting = GreetingTimer(ctx.room.name)
+    await ctx.connect()
+    graph_llm = await create_llm(ctx)
     session = AgentSession(
         stt=deepgram.STT(model="nova-3", language="multi"),
-        llm=openai.LLM(model="gpt-4o-mini"),
+        llm=graph_llm,
         tts=cartesia.TTS(model="sonic-2", voice="f786b574-daa5-4673-aa0c-cbe3e8534c02"),
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata["vad"],
         turn_detection=MultilingualModel(),
     )
+    first_audio = FirstAudioTracker()
+    session.on("metrics_collected", lambda event: first_audio.collect(event.metrics))
+    session.on("agent_state_changed", lambda event: greeting.on_agent_state(event.new_state))
+    if getattr(graph_llm, "speculation", None):
+        session.on(
+            "user_input_transcribed",
+            lambda event: graph_llm.speculation.on_transcript(event.transcript, event.is_final)
+        )
 
     await session.start(
         room=ctx.room,
         agent=Assistant(),
         room_input_options=RoomInputOptions(
             # LiveKit Cloud enhanced noise cancellation
-            # - If self-hosting, omit this parameter
+            # - If self-hosting, set VOICE_NOISE_CANCELLATION=false
             # - For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
+            noise_cancellation=noise_cancellation.BVC() if settings.VOICE_NOISE_CANCELLATION else None,
         ),
     )
 
-    await session.start(
-        room=ctx.room,
-        agent=Assistant(),
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
-
-    await ctx.connect()
     await session.generate_reply(
         instructions="Greet the user and offer your assistance."
     )
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
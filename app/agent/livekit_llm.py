@@ -0,0 +1,127 @@
+import asyncio
+import uuid
+from typing import Awaitable, Optional
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr, llm
+
+from app.agent.chat_agent import AISupport
+from app.agent.speculation import SpeculativeAnswers
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def last_user_message(chat_ctx: llm.ChatContext) -> Optional[str]:
+    """Text of the user message the reply is for, or None when the last message isn't the user's."""
+    for item in reversed(chat_ctx.items):
+        if item.type != "message":
+            continue
+        return item.text_content if item.role == "user" else None
+    return None
+
+
+class LangGraphLLM(llm.LLM):
+    """LiveKit LLM that answers with the chat service's LangGraph agent.
+
+    A user turn goes through ``AISupport.ask_stream``: the same memories, rolling
+    summary, chat history, supervisor and MCP tools as the HTTP chat, stored in the
+    same chat history. The answer is streamed, so the TTS starts on its first
+    sentence. Replies that don't answer a user message (the greeting) are left to
+    ``fallback``. ``support`` is a task or future, since it may still be starting
+    up (connecting the MCP tools); the first user turn waits for it. With
+    ``speculation``, a turn whose answer was already started from its interim
+    transcripts continues that answer instead of starting over.
+    """
+
+    def __init__(
+        self,
+        support: Awaitable[AISupport],
+        tenant_id: str,
+        user_id: str,
+        chat_id: str,
+        fallback: llm.LLM,
+        speculation: Optional[SpeculativeAnswers] = None
+    ):
+        super().__init__()
+        self.support = support
+        self.tenant_id = tenant_id
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.fallback = fallback
+        self.speculation = speculation
+
+    @property
+    def model(self) -> str:
+        return "langgraph"
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: Optional[list] = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict] = NOT_GIVEN,
+    ) -> llm.LLMStream:
+        question = last_user_message(chat_ctx)
+        if question is None:
+            return self.fallback.chat(
+                chat_ctx=chat_ctx,
+                tools=tools,
+                conn_options=conn_options,
+                parallel_tool_calls=parallel_tool_calls,
+                tool_choice=tool_choice,
+                extra_kwargs=extra_kwargs,
+            )
+        return LangGraphStream(self, question, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class LangGraphStream(llm.LLMStream):
+    def __init__(
+        self,
+        graph_llm: LangGraphLLM,
+        question: str,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list,
+        conn_options: APIConnectOptions
+    ):
+        super().__init__(graph_llm, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
+        self._graph_llm = graph_llm
+        self._question = question
+
+    async def _run(self) -> None:
+        request_id = uuid.uuid4().hex
+        graph_llm = self._graph_llm
+        # Shielded: an interrupted first turn must not cancel the agent start-up shared by later turns
+        support = await asyncio.shield(graph_llm.support)
+        speculation = graph_llm.speculation.claim(self._question) if graph_llm.speculation else None
+        if speculation is None:
+            deltas = support.ask_stream(
+                question=self._question,
+                user_id=graph_llm.user_id,
+                chat_id=graph_llm.chat_id,
+                tenant_id=graph_llm.tenant_id
+            )
+        else:
+            deltas = speculation.stream()
+
+        try:
+            async for delta in deltas:
+                self._event_ch.send_nowait(
+                    llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=delta))
+                )
+        finally:
+            # An interrupted reply stops the speculative run it was playing, like a regular one
+            if speculation is not None and not speculation.task.done():
+                speculation.cancel()
+
+        if speculation is not None:
+            await support.commit_turn(
+                question=self._question,
+                answer=speculation.answer,
+                user_id=graph_llm.user_id,
+                chat_id=graph_llm.chat_id,
+                tenant_id=graph_llm.tenant_id
+            )
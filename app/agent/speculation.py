@@ -0,0 +1,158 @@
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, List, Optional
+
+from app.agent.chat_agent import AISupport
+from app.agent.langgraph_agent import AnswerStream
+from app.core.metrics import VOICE_SPECULATION, VOICE_SPECULATION_SAVED
+from app.utils.logger import setup_logger
+from app.utils.single_flight import normalize_question
+
+logger = setup_logger(__name__)
+
+
+class Speculation:
+    """An unstored answer run started from an interim transcript, buffered until it is claimed."""
+
+    def __init__(self, support: AISupport, question: str, user_id: str, chat_id: str, tenant_id: str):
+        self.question = question
+        self.key = normalize_question(question)
+        self.started = time.perf_counter()
+        self.answer = AnswerStream()
+        self._deltas: List[str] = []
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(self._run(support, user_id, chat_id, tenant_id))
+
+    async def _run(self, support: AISupport, user_id: str, chat_id: str, tenant_id: str) -> None:
+        try:
+            async for delta in support.ask_stream(
+                self.question, user_id=user_id, chat_id=chat_id, tenant_id=tenant_id, answer=self.answer, store=False
+            ):
+                self._deltas.append(delta)
+                self._changed.set()
+        finally:
+            self._changed.set()
+
+    async def stream(self) -> AsyncIterator[str]:
+        """The answer text generated so far, then the rest as it comes."""
+        sent = 0
+        while True:
+            while sent < len(self._deltas):
+                yield self._deltas[sent]
+                sent += 1
+            if self.task.done():
+                self.task.result()
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+class SpeculativeAnswers:
+    """Starts answering a voice turn before the end of turn, from its interim transcripts.
+
+    Every interim transcript (re)arms a timer; once the transcript has not changed
+    for ``stable_seconds``, an unstored ``ask_stream`` run starts on it. When the
+    turn ends, ``claim`` hands over the run if the final transcript is the same
+    question (a hit: its output is spoken and committed), otherwise the run is
+    cancelled (a miss). At most ``max_concurrent`` runs per worker process are in
+    flight. Outcomes are counted in ``voice_speculation_total`` and the head start
+    of hits is observed in ``voice_speculation_saved_seconds``.
+    """
+
+    running = 0
+
+    def __init__(
+        self,
+        support: Awaitable[AISupport],
+        user_id: str,
+        chat_id: str,
+        tenant_id: str,
+        stable_seconds: float,
+        max_concurrent: int
+    ):
+        self.support = support
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.tenant_id = tenant_id
+        self.stable_seconds = stable_seconds
+        self.max_concurrent = max_concurrent
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._starting: Optional[asyncio.Task] = None
+        self._pending_key: Optional[str] = None
+        self._current: Optional[Speculation] = None
+
+    def on_transcript(self, transcript: str, is_final: bool) -> None:
+        """Feed a ``user_input_transcribed`` event."""
+        key = normalize_question(transcript)
+        if is_final or not key or key == self._pending_key:
+            return
+        self._pending_key = key
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.stable_seconds, self._schedule_start, transcript)
+
+    def _schedule_start(self, transcript: str) -> None:
+        self._timer = None
+        if self._starting is not None:
+            self._starting.cancel()
+        self._starting = asyncio.create_task(self._start(transcript))
+
+    async def _start(self, transcript: str) -> None:
+        key = normalize_question(transcript)
+        # Shielded: cancelling this start must not cancel the agent start-up it waits for
+        support = await asyncio.shield(self.support)
+        # The turn ended or the transcript moved on while the agent was starting up
+        if key != self._pending_key:
+            return
+        if self._current is not None:
+            if self._current.key == key:
+                return
+            self._drop("miss")
+        if SpeculativeAnswers.running >= self.max_concurrent:
+            VOICE_SPECULATION.labels(result="skipped").inc()
+            return
+        self._current = Speculation(support, transcript, self.user_id, self.chat_id, self.tenant_id)
+        SpeculativeAnswers.running += 1
+        self._current.task.add_done_callback(lambda _: self._release())
+        logger.info(f"Speculating on interim transcript: {transcript!r}")
+
+    @staticmethod
+    def _release() -> None:
+        SpeculativeAnswers.running -= 1
+
+    def _drop(self, result: str) -> None:
+        VOICE_SPECULATION.labels(result=result).inc()
+        self._current.cancel()
+        self._current = None
+
+    def _cancel_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._starting is not None:
+            self._starting.cancel()
+            self._starting = None
+        self._pending_key = None
+
+    def claim(self, question: str) -> Optional[Speculation]:
+        """The run started for ``question``, if any; any other run is cancelled."""
+        self._cancel_pending()
+        if self._current is None:
+            return None
+        if self._current.key != normalize_question(question):
+            self._drop("miss")
+            return None
+
+        speculation, self._current = self._current, None
+        VOICE_SPECULATION.labels(result="hit").inc()
+        VOICE_SPECULATION_SAVED.observe(time.perf_counter() - speculation.started)
+        return speculation
+
+    def close(self) -> None:
+        self._cancel_pending()
+        if self._current is not None:
+            self._current.cancel()
+            self._current = None
@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from livekit.agents import metrics
+
+from app.core.metrics import VOICE_FIRST_AUDIO, VOICE_JOIN_TO_GREETING
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Turns whose metrics are still incomplete (e.g. interrupted replies) are dropped beyond this.
+MAX_PENDING_TURNS = 64
+
+
+class FirstAudioTracker:
+    """Time to first audio of every voice turn, assembled from LiveKit's per-stage metrics.
+
+    For each turn (speech id) LiveKit reports the end-of-utterance delay (user stopped
+    speaking until the turn was committed), the LLM time to first token and the TTS
+    time to first byte. Their sum is how long the user waits for the reply to start
+    playing; it is logged and observed in ``voice_time_to_first_audio_seconds``.
+    """
+
+    def __init__(self):
+        self._turns: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def collect(self, stage_metrics) -> None:
+        """Feed one ``metrics_collected`` event's metrics."""
+        if isinstance(stage_metrics, metrics.EOUMetrics):
+            stage, value = "end_of_utterance", stage_metrics.end_of_utterance_delay
+        elif isinstance(stage_metrics, metrics.LLMMetrics):
+            stage, value = "llm_ttft", stage_metrics.ttft
+        elif isinstance(stage_metrics, metrics.TTSMetrics):
+            stage, value = "tts_ttfb", stage_metrics.ttfb
+        else:
+            return
+        speech_id = getattr(stage_metrics, "speech_id", None)
+        if not speech_id or value is None or value < 0:
+            return
+
+        turn = self._turns.setdefault(speech_id, {})
+        # A reply may be synthesized in several segments; the first one is what the user hears first.
+        turn.setdefault(stage, value)
+        while len(self._turns) > MAX_PENDING_TURNS:
+            self._turns.popitem(last=False)
+        if len(turn) == 3:
+            del self._turns[speech_id]
+            total = sum(turn.values())
+            VOICE_FIRST_AUDIO.observe(total)
+            logger.info(
+                f"Voice turn {speech_id}: first audio after {total:.3f}s "
+                f"(end of utterance {turn['end_of_utterance']:.3f}s, LLM first token {turn['llm_ttft']:.3f}s, "
+                f"TTS first byte {turn['tts_ttfb']:.3f}s)"
+            )
+
+
+class GreetingTimer:
+    """Join-to-greeting latency of a room: from the job starting to the agent first speaking.
+
+    Logged and observed in ``voice_join_to_greeting_seconds``.
+    """
+
+    def __init__(self, room_name: str):
+        self.room_name = room_name
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+
+    def on_agent_state(self, state: str) -> None:
+        """Feed the new state of every ``agent_state_changed`` event."""
+        if state != "speaking" or self.latency is not None:
+            return
+        self.latency = time.perf_counter() - self.started
+        VOICE_JOIN_TO_GREETING.observe(self.latency)
+        logger.info(f"Room {self.room_name}: greeting started {self.latency:.3f}s after joining")
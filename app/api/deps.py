@@ -55,4 +55,4 @@ async def get_current_user(
     user = await user_service.get(user_id=int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    return user
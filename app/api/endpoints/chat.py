@@ -6,6 +6,7 @@ from fastapi.responses import StreamingResponse
 from app.api.deps import get_streaming_service, get_current_user
 from app.models.user import User as DBUser
 from app.schemas.api import LLMRequest
+from app.services.admission import AdmissionController, get_admission_controller
 from app.services.streaming import StreamingService
 from app.utils.logger import setup_logger
 
@@ -17,10 +18,11 @@ router = APIRouter()
 async def chat_completions(
     request: LLMRequest,
     current_user: Annotated[DBUser, Depends(get_current_user)],
-    streaming_service: StreamingService = Depends(get_streaming_service)
+    streaming_service: StreamingService = Depends(get_streaming_service),
+    admission_controller: AdmissionController = Depends(get_admission_controller)
 ) -> StreamingResponse:
     logger.info(f"Received chat completions request {request}")
-    return await streaming_service.streaming_chat(request, current_user)
+    return await streaming_service.streaming_chat(request, current_user, admission_controller)
 
 
 
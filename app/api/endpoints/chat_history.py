@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional
 
-from app.schemas.chat import ChatHistoryResponse, ChatMessage
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.schemas.chat import (
+    ChatHistoryResponse,
+    ChatMessage,
+    ChatSearchResponse,
+    ChatSearchResult,
+    ChatSession,
+    ChatSessionsResponse,
+)
 from app.services.vector_store import MultiTenantVectorStore
 from app.api.deps import get_current_user, get_vector_store
 from app.utils.logger import setup_logger
+from app.utils.ndjson import iter_ndjson
 
 logger = setup_logger(__name__)
 router = APIRouter()
@@ -13,6 +25,7 @@ router = APIRouter()
 async def get_user_chats(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    exact_total: Optional[bool] = Query(None),
     vector_store: MultiTenantVectorStore = Depends(get_vector_store),
     current_user = Depends(get_current_user)
 ):
@@ -29,23 +42,114 @@ async def get_user_chats(
         
         return ChatHistoryResponse(
             messages=messages,
-            total=len(messages)
+            total=vector_store.count_turns(
+                tenant_id=current_user.tenant_id,
+                user_id=str(current_user.id),
+                exact=exact_total
+            )
         )
     except Exception as e:
         logger.error(f"Error retrieving chat history: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve chat history")
 
 
+@router.get("/chats/sessions", response_model=ChatSessionsResponse)
+async def get_chat_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, pattern=r"^[0-9.e+-]+:[0-9]+$"),
+    vector_store: MultiTenantVectorStore = Depends(get_vector_store),
+    current_user = Depends(get_current_user)
+):
+    """List the current user's chats, most recently active first"""
+    try:
+        sessions, next_cursor = vector_store.list_chat_sessions(
+            tenant_id=current_user.tenant_id,
+            user_id=str(current_user.id),
+            limit=limit,
+            cursor=cursor
+        )
+
+        return ChatSessionsResponse(
+            sessions=[ChatSession(**session) for session in sessions],
+            next_cursor=next_cursor
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving chat sessions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve chat sessions")
+
+
+@router.get("/chats/search", response_model=ChatSearchResponse)
+async def search_user_chats(
+    q: str = Query(..., min_length=1, max_length=1000),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    score_threshold: Optional[float] = Query(None, ge=-1, le=1),
+    hybrid: Optional[bool] = Query(None),
+    vector_store: MultiTenantVectorStore = Depends(get_vector_store),
+    current_user = Depends(get_current_user)
+):
+    """Search the current user's chat history by meaning (and keywords in hybrid mode)"""
+    try:
+        results = vector_store.search_chats(
+            query=q,
+            user_id=str(current_user.id),
+            tenant_id=current_user.tenant_id,
+            limit=limit,
+            offset=offset,
+            score_threshold=settings.CHAT_SEARCH_SCORE_THRESHOLD if score_threshold is None else score_threshold,
+            hybrid=settings.CHAT_SEARCH_HYBRID if hybrid is None else hybrid
+        )
+
+        matches = [ChatSearchResult(**result) for result in results]
+
+        return ChatSearchResponse(
+            results=matches,
+            total=len(matches)
+        )
+    except Exception as e:
+        logger.error(f"Error searching chat history: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search chat history")
+
+
+@router.get("/export")
+async def export_chats(
+    scope: Literal["user", "tenant"] = Query("user"),
+    gzip: bool = Query(False),
+    vector_store: MultiTenantVectorStore = Depends(get_vector_store),
+    current_user = Depends(get_current_user)
+) -> StreamingResponse:
+    """Stream the current user's (or, for tenant admins, the tenant's) chat history as NDJSON"""
+    if scope == "tenant" and current_user.username not in settings.EXPORT_TENANT_ADMINS:
+        raise HTTPException(status_code=403, detail="Not allowed to export the tenant's chat history")
+
+    records = vector_store.iter_history(
+        tenant_id=current_user.tenant_id,
+        user_id=str(current_user.id) if scope == "user" else None
+    )
+    filename = f"chat-history-{current_user.tenant_id}{'' if scope == 'tenant' else f'-{current_user.id}'}.ndjson"
+    if gzip:
+        filename += ".gz"
+    # A sync generator: Starlette iterates it in a worker thread, next to the blocking Qdrant calls.
+    return StreamingResponse(
+        iter_ndjson(records, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/chats/{chat_id}", response_model=ChatHistoryResponse)
 async def get_chat_by_id(
     chat_id: str,
+    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user),
     vector_store: MultiTenantVectorStore = Depends(get_vector_store),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
-
+    offset: int = Query(0, ge=0),
+    exact_total: Optional[bool] = Query(None)
 ):
     """Get all messages for a specific chat ID"""
+    # Opening a chat usually precedes a message in it; warm the turn cache for that completion.
+    background_tasks.add_task(vector_store.prefetch_chat, chat_id, current_user.tenant_id, str(current_user.id))
     try:
         chat_messages = vector_store.get_chat_by_id(
             chat_id=chat_id,
@@ -59,7 +163,12 @@ async def get_chat_by_id(
         
         return ChatHistoryResponse(
             messages=messages,
-            total=len(messages)
+            total=vector_store.count_turns(
+                tenant_id=current_user.tenant_id,
+                user_id=str(current_user.id),
+                chat_id=chat_id,
+                exact=exact_total
+            )
         )
     except HTTPException:
         raise
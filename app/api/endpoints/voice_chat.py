@@ -1,3 +1,4 @@
+import json
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
@@ -6,7 +7,6 @@ from app.api.deps import get_current_user
 from app.models.user import User as DBUser
 from app.schemas.token import LivekitToken
 from app.utils.logger import setup_logger
-from livekit import api
 from app.core.config import settings
 
 logger = setup_logger(__name__)
@@ -17,12 +17,16 @@ router = APIRouter()
 async def chat_completions(
     current_user: Annotated[DBUser, Depends(get_current_user)]
 ) -> LivekitToken:
+    from livekit import api
+
     logger.info(f"Received generate livekit token request from user {current_user}")
 
     token = (
         api.AccessToken(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET)
         .with_identity(f"user_{current_user.username}")
         .with_name(f"User {current_user.username}")
+        # Lets the voice worker answer with this user's memories and chat history
+        .with_metadata(json.dumps({"tenant_id": current_user.tenant_id, "user_id": str(current_user.id)}))
         .with_grants(
             api.VideoGrants(
                 room_join=True,
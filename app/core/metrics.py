@@ -0,0 +1,72 @@
+"""
+Prometheus metrics shared by the API.
+
+Metrics are exposed on ``/metrics``. When running several gunicorn workers set
+``PROMETHEUS_MULTIPROC_DIR`` so the values of all workers are aggregated.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "chat_admission_queue_wait_seconds",
+    "Time a chat completion waited for an admission slot",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+ADMISSION_REJECTIONS = Counter(
+    "chat_admission_rejections_total",
+    "Chat completions rejected by admission control",
+    ["reason"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "chat_admission_in_flight",
+    "Chat completions currently holding an admission slot",
+    multiprocess_mode="livesum",
+)
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls_total",
+    "Calls through a single-flight group, by whether they started or joined the work",
+    ["name", "result"],
+)
+
+CHAT_CACHE_REQUESTS = Counter(
+    "chat_context_cache_requests_total",
+    "Chat context lookups served from the in-process turn cache or from Qdrant",
+    ["result"],
+)
+
+VOICE_FIRST_AUDIO = Histogram(
+    "voice_time_to_first_audio_seconds",
+    "Time from the end of the user's speech to the first audio of the reply",
+    buckets=(0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 8),
+)
+
+VOICE_JOIN_TO_GREETING = Histogram(
+    "voice_join_to_greeting_seconds",
+    "Time from the voice worker joining a room to the greeting starting to play",
+    buckets=(0.5, 1, 1.5, 2, 3, 5, 8, 13),
+)
+
+VOICE_SPECULATION = Counter(
+    "voice_speculation_total",
+    "Answers started from interim transcripts, by whether the final transcript used them",
+    ["result"],
+)
+
+VOICE_SPECULATION_SAVED = Histogram(
+    "voice_speculation_saved_seconds",
+    "Head start of a used speculative answer over starting at the end of the user's turn",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5),
+)
+
+
+def make_metrics_app():
+    """ASGI app serving the metrics registry (aggregated across workers if configured)."""
+    import os
+
+    from prometheus_client import CollectorRegistry, make_asgi_app, multiprocess
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return make_asgi_app(registry=registry)
+    return make_asgi_app()
@@ -1,16 +1,66 @@
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 
-async_engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI.replace("sqlite:///", "sqlite+aiosqlite:///"),
-    pool_pre_ping=True,
-    echo=False,
-)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_async_database_uri(uri: str) -> str:
+    """Map a plain database URI onto its async driver (aiosqlite / asyncpg)."""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is not None:
+        url = url.set(drivername=driver)
+    return url.render_as_string(hide_password=False)
+
+
+def _is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == "sqlite"
+
+
+def _engine_options(uri: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": True, "echo": False}
+    if _is_sqlite(uri):
+        database = make_url(uri).database
+        if not database or database == ":memory:":
+            # In-memory SQLite runs on a single static connection.
+            return options
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_engine_from_settings(uri: str = settings.SQLALCHEMY_DATABASE_URI) -> AsyncEngine:
+    engine = create_async_engine(get_async_database_uri(uri), **_engine_options(uri))
+    if _is_sqlite(uri):
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+async_engine = create_engine_from_settings()
 AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -19,13 +69,6 @@ AsyncSessionLocal = async_sessionmaker(
     class_=AsyncSession,
 )
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI, 
-    pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite") else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 
 async def get_db() -> AsyncGenerator[AsyncSession | Any, Any]:
     async with AsyncSessionLocal() as session:
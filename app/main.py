@@ -5,10 +5,14 @@ import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError
 
+from app.agent.chat_agent import AISupport
 from app.agent.langgraph_agent import initialize_graph, close_graph
 from app.api.api import api_router
 from app.core.config import settings
+from app.core.metrics import make_metrics_app
 from app.db.base import Base
 from app.db.session import async_engine
 from app.utils.logger import setup_logger
@@ -17,17 +21,34 @@ logger = setup_logger(__name__)
 
 load_dotenv()
 
+
+async def create_schema() -> None:
+    """Create the missing tables; another worker creating them at the same time is not an error."""
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except DBAPIError:
+        async with async_engine.connect() as conn:
+            missing = await conn.run_sync(
+                lambda sync_conn: [name for name in Base.metadata.tables if not inspect(sync_conn).has_table(name)]
+            )
+        if missing:
+            raise
+        logger.info("Database schema was created by another worker")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await initialize_graph()
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await create_schema()
 
     logger.info(f"LANGCHAIN_TRACING_V2: {os.getenv('LANGCHAIN_TRACING_V2')}")
     logger.info(f"LANGSMITH_PROJECT: {os.getenv('LANGSMITH_PROJECT')}")
 
     yield
 
+    if AISupport._instance is not None:
+        await AISupport._instance.aclose()
     await async_engine.dispose()
     await close_graph()
 
@@ -48,6 +69,7 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.mount("/metrics", make_metrics_app())
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
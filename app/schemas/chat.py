@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -16,4 +16,32 @@ class ChatMessage(BaseModel):
 class ChatHistoryResponse(BaseModel):
     """Response model for chat history endpoints"""
     messages: List[ChatMessage]
-    total: int
\ No newline at end of file
+    # All matching messages, not just this page
+    total: int
+
+
+class ChatSearchResult(ChatMessage):
+    """Chat message matched by a search, with its relevance score"""
+    # Cosine similarity, or the reciprocal rank fusion score (rank-based, not a similarity) in hybrid mode
+    score: float
+
+
+class ChatSearchResponse(BaseModel):
+    """Response model for chat history search"""
+    results: List[ChatSearchResult]
+    total: int
+
+
+class ChatSession(BaseModel):
+    """A chat in the chat list with its latest turn"""
+    chat_id: str
+    last_user_message: str
+    last_assistant_message: str
+    last_timestamp: str
+    turn_count: int
+
+
+class ChatSessionsResponse(BaseModel):
+    """Response model for the chat list"""
+    sessions: List[ChatSession]
+    next_cursor: Optional[str] = None
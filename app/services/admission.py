@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_REJECTIONS
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AdmissionTicket:
+    """A granted admission slot. Releasing it more than once is a no-op."""
+
+    def __init__(self, controller: "AdmissionController", tenant_id: str):
+        self.controller = controller
+        self.tenant_id = tenant_id
+        self._released = False
+        self._run: Optional[asyncio.Future] = None
+
+    def hold_until_done(self, run: asyncio.Future) -> None:
+        """Keep the slot until ``run`` is done, however early ``release`` is called."""
+        self._run = run
+        run.add_done_callback(lambda _: self.release())
+
+    def release(self) -> None:
+        if self._released or (self._run is not None and not self._run.done()):
+            return
+        self._released = True
+        self.controller._release(self.tenant_id)
+
+
+class _Waiter:
+    def __init__(self, tenant_id: str, future: asyncio.Future):
+        self.tenant_id = tenant_id
+        self.future = future
+
+
+class AdmissionController:
+    """Admission control for chat completions.
+
+    Limits the number of concurrent graph runs per process (``max_concurrency``)
+    and per tenant (``tenant_max_concurrency`` scaled by the tenant's weight).
+    Requests that don't get a slot immediately wait in a short FIFO queue;
+    when the tenant is over its share the request gets 429, when the process
+    is saturated and the queue is full or the wait times out it gets 503.
+    Both responses carry ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tenant_max_concurrency: int,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        max_queue: int = 0,
+        queue_timeout: float = 0.0,
+        retry_after: int = 1,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.tenant_weights = tenant_weights or {}
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._active = 0
+        # In-flight plus queued requests per tenant
+        self._tenant_load: Dict[str, int] = defaultdict(int)
+        self._waiters: Deque[_Waiter] = deque()
+
+    def tenant_limit(self, tenant_id: str) -> int:
+        weight = self.tenant_weights.get(tenant_id, 1.0)
+        return max(1, math.floor(self.tenant_max_concurrency * weight))
+
+    async def acquire(self, tenant_id: str) -> AdmissionTicket:
+        """Wait for a slot or raise an HTTP 429/503 error."""
+        if self._tenant_load.get(tenant_id, 0) >= self.tenant_limit(tenant_id):
+            self._reject("tenant_limit", status.HTTP_429_TOO_MANY_REQUESTS, tenant_id)
+
+        if self._active < self.max_concurrency and not self._waiters:
+            self._grant(tenant_id)
+            ADMISSION_QUEUE_WAIT.observe(0)
+            return AdmissionTicket(self, tenant_id)
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full", status.HTTP_503_SERVICE_UNAVAILABLE, tenant_id)
+
+        waiter = _Waiter(tenant_id, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._tenant_load[tenant_id] += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._drop_waiter(waiter)
+                self._reject("queue_timeout", status.HTTP_503_SERVICE_UNAVAILABLE, tenant_id)
+        except asyncio.CancelledError:
+            # The slot may have been handed over while we were being cancelled.
+            if waiter.future.done():
+                self._release(tenant_id)
+            else:
+                self._drop_waiter(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - started)
+
+        return AdmissionTicket(self, tenant_id)
+
+    def _grant(self, tenant_id: str) -> None:
+        self._active += 1
+        self._tenant_load[tenant_id] += 1
+        ADMISSION_IN_FLIGHT.inc()
+
+    def _drop_waiter(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        self._decrement_tenant(waiter.tenant_id)
+
+    def _decrement_tenant(self, tenant_id: str) -> None:
+        self._tenant_load[tenant_id] -= 1
+        if self._tenant_load[tenant_id] <= 0:
+            del self._tenant_load[tenant_id]
+
+    def _release(self, tenant_id: str) -> None:
+        self._decrement_tenant(tenant_id)
+        # Hand the slot straight to the next waiter, keeping the queue FIFO.
+        if self._waiters:
+            self._waiters.popleft().future.set_result(None)
+            return
+        self._active -= 1
+        ADMISSION_IN_FLIGHT.dec()
+
+    def _reject(self, reason: str, status_code: int, tenant_id: str) -> None:
+        ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        logger.warning(f"Rejected chat completion for tenant {tenant_id}: {reason}")
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many concurrent requests, please retry later",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide admission controller built from settings."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+            tenant_max_concurrency=settings.ADMISSION_TENANT_MAX_CONCURRENCY,
+            tenant_weights=settings.ADMISSION_TENANT_WEIGHTS,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            retry_after=settings.ADMISSION_RETRY_AFTER,
+        )
+    return _controller
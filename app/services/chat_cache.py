@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.metrics import CHAT_CACHE_REQUESTS
+
+# (tenant_id, user_id, chat_id)
+ChatKey = Tuple[str, str, str]
+
+
+@dataclass
+class _CachedChat:
+    turns: List[Dict[str, Any]]
+    complete: bool
+    expires_at: float
+
+
+class ChatTurnCache:
+    """In-process, size-bounded LRU of the most recent turns of each chat.
+
+    An entry holds the newest ``turns_per_chat`` turns of one chat, oldest first,
+    and whether they are the whole chat. It answers "the turns after ``since``"
+    whenever all of those are cached, which is the context a completion needs.
+    Turns stored by this process are appended write-through; entries expire after
+    ``ttl_seconds``, and callers that can tell (``newest``) drop an entry that
+    lacks turns written by other workers with ``invalidate``.
+    Lookups are counted in the ``chat_context_cache_requests_total`` metric.
+    """
+
+    def __init__(self, max_chats: int, turns_per_chat: int, ttl_seconds: float):
+        self.max_chats = max_chats
+        self.turns_per_chat = turns_per_chat
+        self.ttl_seconds = ttl_seconds
+        self._chats: "OrderedDict[ChatKey, _CachedChat]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_chats > 0 and self.turns_per_chat > 0
+
+    @staticmethod
+    def select(
+        turns: List[Dict[str, Any]],
+        complete: bool,
+        since: Optional[float],
+        limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """The turns after ``since`` (oldest first, at most ``limit``), or None if some may be missing."""
+        if not complete and (since is None or not turns or since < turns[0]["created_at"]):
+            return None
+        return [turn for turn in turns if since is None or turn["created_at"] > since][:limit]
+
+    def _fresh(self, key: ChatKey) -> Optional[_CachedChat]:
+        entry = self._chats.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._chats[key]
+            return None
+        return entry
+
+    def contains(self, key: ChatKey) -> bool:
+        with self._lock:
+            return self._fresh(key) is not None
+
+    def newest(self, key: ChatKey) -> Tuple[bool, Optional[float]]:
+        """Whether the chat is cached and, if so, the ``created_at`` of its newest cached turn."""
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None:
+                return False, None
+            return True, entry.turns[-1]["created_at"] if entry.turns else None
+
+    def invalidate(self, key: ChatKey) -> None:
+        with self._lock:
+            self._chats.pop(key, None)
+
+    def turns_since(self, key: ChatKey, since: Optional[float], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Cached turns of a chat after ``since``, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._fresh(key)
+            turns = None
+            if entry is not None:
+                turns = self.select(entry.turns, entry.complete, since, limit)
+                if turns is not None:
+                    self._chats.move_to_end(key)
+        CHAT_CACHE_REQUESTS.labels(result="miss" if turns is None else "hit").inc()
+        return turns
+
+    def put(self, key: ChatKey, turns: List[Dict[str, Any]], complete: bool) -> None:
+        """Cache the newest turns of a chat, oldest first; ``complete`` if they are all of its turns."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._chats[key] = _CachedChat(
+                turns=turns[-self.turns_per_chat:],
+                complete=complete and len(turns) <= self.turns_per_chat,
+                expires_at=time.monotonic() + self.ttl_seconds
+            )
+            self._chats.move_to_end(key)
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+
+    def append(self, key: ChatKey, turn: Dict[str, Any]) -> None:
+        """Add a newly stored turn to its chat's entry, if the chat is cached."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None:
+                return
+            entry.turns.append(turn)
+            if len(entry.turns) > self.turns_per_chat:
+                del entry.turns[0]
+                entry.complete = False
+            self._chats.move_to_end(key)
@@ -0,0 +1,91 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MemoryBatcher:
+    """Batches mem0 fact extraction per user.
+
+    Turns are buffered per user and handed to ``AsyncMemory.add`` as one message
+    list, so a single LLM extraction call covers several turns. A user's buffer is
+    flushed once it holds ``batch_turns`` turns or after ``idle_seconds`` without a
+    new turn. Larger batches cost fewer extraction calls, but facts become
+    searchable later.
+    """
+
+    def __init__(
+        self,
+        memory: Any,
+        metadata: Optional[Dict[str, Any]] = None,
+        batch_turns: int = settings.MEMORY_BATCH_TURNS,
+        idle_seconds: float = settings.MEMORY_BATCH_IDLE_SECONDS
+    ):
+        self.memory = memory
+        self.metadata = metadata or {}
+        self.batch_turns = batch_turns
+        self.idle_seconds = idle_seconds
+
+        self._buffers: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+        self._idle_timers: Dict[str, asyncio.TimerHandle] = {}
+        # One flush at a time per user, so mem0 sees its own previous updates.
+        # A user's lock is dropped once no flush of theirs is running or waiting.
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def add_turn(self, user_id: str, question: str, answer: str) -> None:
+        """Buffer a turn, flushing in the background when the batch is full."""
+        buffer = self._buffers[user_id]
+        buffer.append({"role": "user", "content": question})
+        buffer.append({"role": "assistant", "content": answer})
+
+        self._cancel_idle_timer(user_id)
+        if len(buffer) // 2 >= self.batch_turns:
+            self._start_flush(user_id)
+        else:
+            loop = asyncio.get_running_loop()
+            self._idle_timers[user_id] = loop.call_later(self.idle_seconds, self._start_flush, user_id)
+
+    def _cancel_idle_timer(self, user_id: str) -> None:
+        timer = self._idle_timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _start_flush(self, user_id: str) -> None:
+        self._idle_timers.pop(user_id, None)
+        task = asyncio.create_task(self.flush(user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, user_id: str) -> None:
+        """Extract facts from all buffered turns of a user in one call."""
+        self._cancel_idle_timer(user_id)
+        messages = self._buffers.pop(user_id, None)
+        if not messages:
+            return
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._lock_users[user_id] = self._lock_users.get(user_id, 0) + 1
+        try:
+            async with lock:
+                try:
+                    await self.memory.add(messages, user_id=user_id, metadata=self.metadata)
+                    logger.info(f"Extracted memories from {len(messages) // 2} turns of user {user_id}")
+                except Exception as e:
+                    logger.error(f"Memory extraction for user {user_id} failed: {str(e)}")
+        finally:
+            self._lock_users[user_id] -= 1
+            if not self._lock_users[user_id]:
+                del self._lock_users[user_id]
+                del self._locks[user_id]
+
+    async def flush_all(self) -> None:
+        """Flush every buffer and wait for running flushes, e.g. on shutdown."""
+        for user_id in list(self._buffers):
+            self._start_flush(user_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
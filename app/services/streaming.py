@@ -1,27 +1,54 @@
-import json
+import asyncio
+import os
 import traceback
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from fastapi.responses import StreamingResponse
 from fastapi import HTTPException
+from starlette.types import Receive, Scope, Send
 
 from app.agent.chat_agent import AISupport
+from app.core.config import settings
 from app.models.user import User
 from app.schemas.api import LLMRequest
+from app.services.admission import AdmissionController, AdmissionTicket
 from app.utils.logger import setup_logger
-from app.utils.openai_mapper import create_streaming_openai_chunk
+from app.utils.openai_mapper import CompletionChunkEncoder, coalesce, iter_words
 
 logger = setup_logger(__name__)
 
 
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response that gives its admission slot back however the response ends.
+
+    The body generator's own cleanup does not run when the client disconnects
+    before the body starts, so the slot is released once the response is done
+    being sent, whether it completed, failed or was cancelled. A graph run the
+    body started keeps the slot until it finishes (``hold_until_done``), since it
+    goes on after a disconnect.
+    """
+
+    def __init__(self, *args, ticket: AdmissionTicket, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
+
+
 class StreamingService:
     _instance = None
+    _pid = None
 
     def __new__(cls, support_agent: AISupport):
-        if cls._instance is None:
+        if cls._instance is None or cls._pid != os.getpid():
             cls._instance = super(StreamingService, cls).__new__(cls)
             cls._instance._initialized = False
+            cls._pid = os.getpid()
         return cls._instance
 
     def __init__(self, support_agent: AISupport):
@@ -30,42 +57,63 @@ class StreamingService:
         self.support_agent = support_agent
         self._initialized = True
 
-    async def streaming_chat(self, request: LLMRequest, current_user: User) -> StreamingResponse:
+    async def streaming_chat(
+        self,
+        request: LLMRequest,
+        current_user: User,
+        admission_controller: Optional[AdmissionController] = None
+    ) -> StreamingResponse:
+        # Taken here rather than in a dependency, so that requests rejected by
+        # validation never hold a slot.
+        ticket = await admission_controller.acquire(current_user.tenant_id) if admission_controller else None
         try:
-            async def generate_stream() -> AsyncGenerator[str, None]:
-                first_chunk = await create_streaming_openai_chunk(role="assistant")
-                yield f"data: {json.dumps(first_chunk)}\n\n"
-
-                response = await self.support_agent.ask(
-                    question=request.user_message,
-                    user_id=str(current_user.id),
-                    chat_id=request.chat_id,
-                    tenant_id=current_user.tenant_id
-                )
-                
-                if "messages" in response and response["messages"]:
-                    full_content = response["messages"][0]
-
-                    chunk_size = 10
-                    
-                    for i in range(0, len(full_content), chunk_size):
-                        content_chunk = full_content[i:i+chunk_size]
-                        chunk_data = await create_streaming_openai_chunk(content=content_chunk)
-                        yield f"data: {json.dumps(chunk_data)}\n\n"
-
-                final_chunk = await create_streaming_openai_chunk(finish_reason="stop")
-                yield f"data: {json.dumps(final_chunk)}\n\n"
-                yield "data: [DONE]\n\n"
-
-            return StreamingResponse(
+            async def generate_stream() -> AsyncGenerator[bytes, None]:
+                try:
+                    encoder = CompletionChunkEncoder()
+                    yield encoder.role()
+
+                    run = asyncio.ensure_future(self.support_agent.ask(
+                        question=request.user_message,
+                        user_id=str(current_user.id),
+                        chat_id=request.chat_id,
+                        tenant_id=current_user.tenant_id
+                    ))
+                    if ticket is not None:
+                        ticket.hold_until_done(run)
+                    # Shielded: a disconnect ends the response, not the run holding the slot
+                    response = await asyncio.shield(run)
+
+                    if "messages" in response and response["messages"]:
+                        full_content = response["messages"][0]
+
+                        async for content_chunk in coalesce(
+                            iter_words(full_content),
+                            max_chars=settings.SSE_CHUNK_MAX_CHARS,
+                            max_delay=settings.SSE_CHUNK_MAX_DELAY
+                        ):
+                            yield encoder.content(content_chunk)
+
+                    yield encoder.finish("stop")
+                    yield encoder.done()
+                finally:
+                    if ticket is not None:
+                        ticket.release()
+
+            headers = {
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+            if ticket is None:
+                return StreamingResponse(generate_stream(), media_type="text/event-stream", headers=headers)
+            return AdmittedStreamingResponse(
                 generate_stream(),
+                ticket=ticket,
                 media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                }
+                headers=headers
             )
         except Exception as e:
+            if ticket is not None:
+                ticket.release()
             logger.error(f"Error in chat_completions: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=str(e))
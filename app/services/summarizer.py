@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.core.config import settings
+from app.services.vector_store import MultiTenantVectorStore
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Merge the previous summary with the new messages into one updated summary.
+Keep facts, decisions, open questions, names, numbers and user preferences that later turns may rely on.
+Drop greetings and small talk. Write in the third person, at most {max_words} words."""
+
+
+class ConversationSummarizer:
+    """Keeps a rolling summary of long chats, updated off the request path.
+
+    After a turn is stored, ``schedule`` starts a background update for the chat.
+    Once at least ``every_n_turns`` turns beyond the ``keep_recent_turns`` most recent
+    ones are not yet covered by the summary, those older turns are folded into the
+    summary record stored next to the chat in Qdrant. The prompt then only needs the
+    summary plus the turns after ``summarized_until``. A single summarization call
+    folds at most ``max_fold_turns`` turns, so the first update of a long chat
+    catches up in several calls instead of overflowing the model's context.
+    """
+
+    def __init__(
+        self,
+        vector_store: MultiTenantVectorStore,
+        every_n_turns: int = settings.SUMMARY_EVERY_N_TURNS,
+        keep_recent_turns: int = settings.SUMMARY_KEEP_RECENT_TURNS,
+        max_fold_turns: int = settings.SUMMARY_MAX_FOLD_TURNS,
+        llm: Optional[BaseChatModel] = None
+    ):
+        self.vector_store = vector_store
+        self.every_n_turns = every_n_turns
+        self.keep_recent_turns = keep_recent_turns
+        self.max_fold_turns = max(1, max_fold_turns)
+        self._llm = llm
+        self._running: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+    @property
+    def llm(self) -> BaseChatModel:
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+
+            self._llm = ChatOpenAI(
+                model=settings.SUMMARY_MODEL,
+                temperature=0,
+                max_tokens=settings.SUMMARY_MAX_TOKENS,
+                api_key=settings.OPENAI_API_KEY
+            )
+        return self._llm
+
+    def schedule(self, chat_id: str, tenant_id: str, user_id: str) -> None:
+        """Start a background summary update unless one is already running for the chat."""
+        key = (tenant_id, user_id, chat_id)
+        if key in self._running:
+            return
+        task = asyncio.create_task(self.update_summary(chat_id, tenant_id, user_id))
+        self._running[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+
+    def _on_done(self, key: Tuple[str, str, str], task: asyncio.Task) -> None:
+        self._running.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Summary update for chat {key} failed: {task.exception()}")
+
+    async def update_summary(self, chat_id: str, tenant_id: str, user_id: str) -> bool:
+        """Fold older turns into the chat's summary if enough have accumulated.
+
+        Returns:
+            True if the summary was rewritten
+        """
+        updated = False
+        while await self._fold_once(chat_id, tenant_id, user_id):
+            updated = True
+        return updated
+
+    async def _fold_once(self, chat_id: str, tenant_id: str, user_id: str) -> bool:
+        """Fold up to ``max_fold_turns`` of the oldest unsummarized turns; False if too few are pending."""
+        record = await asyncio.to_thread(self.vector_store.get_chat_summary, chat_id, tenant_id, user_id)
+        since = record["summarized_until"] if record else None
+
+        pending = await asyncio.to_thread(
+            self.vector_store.count_chat_turns_since, chat_id, tenant_id, user_id, since
+        )
+        if pending < self.keep_recent_turns + self.every_n_turns:
+            return False
+
+        fold_count = min(pending - self.keep_recent_turns, self.max_fold_turns)
+        to_fold = await asyncio.to_thread(
+            self.vector_store.get_chat_turns_since, chat_id, tenant_id, user_id, since, fold_count
+        )
+        if not to_fold:
+            return False
+
+        summary = await self.summarize(record["summary"] if record else None, to_fold)
+        summarized_turns = (record["summarized_turns"] if record else 0) + len(to_fold)
+        await asyncio.to_thread(
+            self.vector_store.store_chat_summary,
+            chat_id,
+            tenant_id,
+            user_id,
+            summary,
+            to_fold[-1]["created_at"],
+            summarized_turns
+        )
+        logger.info(f"Summarized {len(to_fold)} turns of chat {chat_id} ({summarized_turns} in total)")
+        return True
+
+    async def summarize(self, previous_summary: Optional[str], turns: List[Dict[str, Any]]) -> str:
+        transcript = "\n".join(
+            f"User: {turn['user_message']}\nAssistant: {turn['assistant_message']}" for turn in turns
+        )
+        response = await self.llm.ainvoke([
+            SystemMessage(content=SUMMARY_SYSTEM_PROMPT.format(max_words=settings.SUMMARY_MAX_WORDS)),
+            HumanMessage(content=f"Previous summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}")
+        ])
+        return response.content.strip()
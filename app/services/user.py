@@ -12,19 +12,10 @@ logger = setup_logger(__name__)
 
 
 class UserService:
-    _instance = None
-
-    def __new__(cls, db: AsyncSession):
-        if cls._instance is None:
-            cls._instance = super(UserService, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    """User persistence bound to a single request's ``AsyncSession``."""
 
     def __init__(self, db: AsyncSession):
-        if self._initialized:
-            return
         self.db = db
-        self._initialized = True
 
     async def get(self, user_id: int) -> Optional[User]:
         query = select(User).where(User.id == user_id)
@@ -1,73 +1,185 @@
-from typing import List, Dict, Any, Optional
-
-from langchain_core.documents import Document
-from langchain_core.embeddings import Embeddings
-from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient, models
-from langchain_qdrant import QdrantVectorStore
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 
 from app.core.config import settings
+from app.services.chat_cache import ChatTurnCache
+from app.utils.embeddings import create_embeddings
 from app.utils.logger import setup_logger
-from app.utils.qdrant import format_chat_results
+from app.utils.qdrant import (
+    HISTORY_PAYLOAD_FIELDS,
+    SESSION_RECORD_TYPE,
+    SUMMARY_RECORD_TYPE,
+    build_session_payload,
+    build_turn_payload,
+    check_vector_size,
+    dedicated_tenant_collections,
+    dense_vector_params,
+    ensure_collection_alias,
+    exclude_auxiliary_records,
+    format_chat_results,
+    format_session_result,
+    format_turn_text,
+    get_qdrant_client,
+    hnsw_config,
+    iter_history_records,
+    quantization_config,
+    resolve_collection_name,
+    search_params,
+    session_point_id,
+    summary_point_id,
+    sync_collection_storage,
+    tenant_collection_name,
+)
+from app.utils.sparse import SPARSE_VECTOR_NAME, encode_document, encode_query
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from qdrant_client import QdrantClient
 
 logger = setup_logger(__name__)
 
+# With a score threshold, hybrid search ranks keyword matches among this many times
+# as many dense candidates as it returns
+HYBRID_DENSE_POOL_FACTOR = 4
+
 
 class MultiTenantVectorStore:
     """A multi-tenant vector store using Qdrant for efficient semantic search with tenant isolation.
     
     This class implements the approach from the tutorial on building multi-tenant chatbots
-    with Qdrant. It uses payload partitioning with tenant_id for data isolation.
+    with Qdrant. It uses payload partitioning with tenant_id for data isolation. Tenants
+    large enough to slow down the others can be moved into a collection of their own
+    (app.tools.move_tenant); every read and write is routed to the tenant's collection.
     """
     _instance = None
+    _pid = None
 
-    def __new__(cls):
-        if cls._instance is None:
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None or cls._pid != os.getpid():
             cls._instance = super(MultiTenantVectorStore, cls).__new__(cls)
             cls._instance._initialized = False
+            cls._pid = os.getpid()
         return cls._instance
     
     def __init__(
         self,
-        collection_name: str = "multi_tenant_chat_history",
-        embedding: Optional[Embeddings] = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            api_key=settings.OPENAI_API_KEY,
-            dimensions=768
-        ),
+        collection_name: Optional[str] = None,
+        embedding: Optional["Embeddings"] = None,
+        client: Optional["QdrantClient"] = None,
     ):
         """Initialize the multi-tenant vector store.
         
         Args:
-            collection_name: Name of the Qdrant collection to use
-            embedding: LangChain embedding model to use (default to OpenAI embeddings)
+            collection_name: Logical collection name (default to CHAT_COLLECTION_NAME); it is
+                an alias of the collection versioned by embedding model and size
+            embedding: LangChain embedding model to use (default to OpenAI embeddings,
+                created on first use)
+            client: Qdrant client to use (default to the process-wide client of get_qdrant_client)
         """
         if self._initialized:
             return
-        self.client = QdrantClient(settings.QDRANT_HOST, port=settings.QDRANT_PORT)
-        self.collection_name = collection_name
-        self.embedding_size = 768
-        self.embedding = embedding
+        self.client: "QdrantClient" = client or get_qdrant_client()
+        self.alias_name = collection_name or settings.CHAT_COLLECTION_NAME
+        self.collection_name = resolve_collection_name(self.client, self.alias_name)
+        self.embedding_size = settings.EMBEDDING_DIMS
+        self._embedding = embedding
+        # (tenant_id, user_id) -> {(chat_id, exact): (expires_at, total)}, least recently written user first
+        self._total_cache: "OrderedDict[Tuple[str, str], Dict[Tuple[Optional[str], bool], Tuple[float, int]]]" = (
+            OrderedDict()
+        )
+        # Dedicated tenant alias -> collection, reloaded every TENANT_ROUTING_REFRESH_SECONDS
+        self._tenant_routes: Dict[str, str] = {}
+        self._routes_expire_at = 0.0
+        self._chat_cache = ChatTurnCache(
+            settings.CHAT_CACHE_MAX_CHATS,
+            settings.CHAT_CACHE_TURNS_PER_CHAT,
+            settings.CHAT_CACHE_TTL_SECONDS
+        )
 
         self._ensure_collection_exists()
         self._initialized = True
+
+    @property
+    def embedding(self) -> "Embeddings":
+        """Embedding model, built lazily so importing this module stays cheap."""
+        if self._embedding is None:
+            self._embedding = create_embeddings(dims=self.embedding_size)
+        return self._embedding
         
+    def _collection_for(self, tenant_id: str) -> str:
+        """Collection holding a tenant's history: its dedicated collection if it has one, else the shared one."""
+        if time.monotonic() >= self._routes_expire_at:
+            self._tenant_routes = dedicated_tenant_collections(self.client, self.alias_name)
+            self._routes_expire_at = time.monotonic() + settings.TENANT_ROUTING_REFRESH_SECONDS
+        return self._tenant_routes.get(tenant_collection_name(self.alias_name, tenant_id), self.collection_name)
+
     def _ensure_collection_exists(self) -> None:
         """Create the collection if it doesn't exist."""
+        from qdrant_client import models
+
         collections = self.client.get_collections().collections
         collection_names = [collection.name for collection in collections]
         
         if self.collection_name not in collection_names:
             logger.info(f"Creating new collection: {self.collection_name}")
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=self.embedding_size,
-                    distance=models.Distance.COSINE
+            try:
+                self.client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=dense_vector_params(self.embedding_size),
+                    sparse_vectors_config={
+                        SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+                    },
+                    quantization_config=quantization_config(),
+                    hnsw_config=hnsw_config(),
+                    on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD
                 )
-            )
+            except Exception:
+                # Another worker may have created it concurrently.
+                if not self.client.collection_exists(self.collection_name):
+                    raise
+                logger.info(f"Collection {self.collection_name} was created by another worker")
         else:
             logger.info(f"Collection {self.collection_name} already exists")
+            check_vector_size(self.client, self.collection_name, self.embedding_size)
+            sync_collection_storage(self.client, self.collection_name, apply=settings.QDRANT_SYNC_STORAGE_ON_START)
+        tenant_collections = dedicated_tenant_collections(self.client, self.alias_name).values()
+        for tenant_collection in tenant_collections:
+            check_vector_size(self.client, tenant_collection, self.embedding_size)
+        ensure_collection_alias(self.client, self.alias_name, self.collection_name)
+
+        # Collections created before hybrid search have no sparse vector; they are searched dense-only.
+        sparse_vectors = self.client.get_collection(self.collection_name).config.params.sparse_vectors
+        self.sparse_enabled = SPARSE_VECTOR_NAME in (sparse_vectors or {})
+        for collection_name in [self.collection_name, *tenant_collections]:
+            self._ensure_payload_indexes(collection_name)
+
+    def _ensure_payload_indexes(self, collection_name: str) -> None:
+        """Index the fields used by history filters, ordering and retention."""
+        from qdrant_client import models
+
+        indexes = {
+            "metadata.tenant_id": models.KeywordIndexParams(
+                type=models.KeywordIndexType.KEYWORD,
+                is_tenant=True
+            ),
+            "metadata.user_id": models.PayloadSchemaType.KEYWORD,
+            "metadata.chat_id": models.PayloadSchemaType.KEYWORD,
+            "timestamp": models.PayloadSchemaType.FLOAT,
+            "last_timestamp": models.PayloadSchemaType.FLOAT,
+            "updated_at": models.PayloadSchemaType.FLOAT,
+            "record_type": models.PayloadSchemaType.KEYWORD,
+        }
+        existing = self.client.get_collection(collection_name).payload_schema
+        for field_name, field_schema in indexes.items():
+            if field_name not in existing:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
     
     def store_conversation(
         self, 
@@ -76,22 +188,163 @@ class MultiTenantVectorStore:
         tenant_id: str, 
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[str]:
-        """Store a conversation in the vector store with tenant isolation"""
-        doc = Document(
-            page_content=f"User: {question}\nAssistant: {answer}",
-            metadata=metadata or {}
+        """Store a conversation turn in the vector store with tenant isolation.
+
+        The turn is stored as structured payload fields (``user_message``,
+        ``assistant_message`` and an epoch ``timestamp``) next to the ``metadata``
+        used for tenant, user and chat filtering.
+        """
+        from qdrant_client import models
+
+        metadata = dict(metadata or {})
+        metadata["tenant_id"] = tenant_id
+        payload = build_turn_payload(question, answer, metadata)
+
+        text = format_turn_text(question, answer)
+        vector = self.embedding.embed_query(text)
+        if self.sparse_enabled:
+            indices, values = encode_document(text)
+            vector = {"": vector, SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)}
+
+        point_id = uuid.uuid4().hex
+        points = [
+            models.PointStruct(
+                id=point_id,
+                vector=vector,
+                payload=payload
+            )
+        ]
+        if settings.CHAT_SESSION_RECORDS and metadata.get("chat_id"):
+            points.append(
+                models.PointStruct(
+                    id=session_point_id(metadata["chat_id"], tenant_id, str(metadata.get("user_id", ""))),
+                    vector=vector,
+                    payload=build_session_payload(payload)
+                )
+            )
+        self.client.upsert(collection_name=self._collection_for(tenant_id), points=points)
+        user_id = str(metadata.get("user_id", ""))
+        self._total_cache.pop((tenant_id, user_id), None)
+        if metadata.get("chat_id"):
+            self._chat_cache.append(
+                (tenant_id, user_id, metadata["chat_id"]),
+                format_chat_results([models.Record(id=point_id, payload=payload)])[0]
+            )
+        return [point_id]
+
+    def search_chats(
+        self,
+        query: str,
+        tenant_id: str,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        score_threshold: Optional[float] = None,
+        hybrid: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Semantic search over a user's conversation turns, best match first.
+
+        The dense embedding search is filtered by tenant and user through the same
+        payload indexes as the history scrolls. With ``hybrid`` (and a collection that
+        stores sparse vectors) a BM25 keyword search is fused with it by reciprocal
+        rank fusion. ``score_threshold`` always applies to the dense cosine score: in
+        hybrid mode keyword matches are ranked only among the turns that pass it. The
+        ``score`` of a result is its cosine similarity, or its RRF score in hybrid mode,
+        which only reflects its ranks in the two searches.
+        """
+        from qdrant_client import models
+
+        query_filter = models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="metadata.tenant_id",
+                    match=models.MatchValue(value=tenant_id)
+                ),
+                models.FieldCondition(
+                    key="metadata.user_id",
+                    match=models.MatchValue(value=str(user_id))
+                )
+            ],
+            must_not=[exclude_auxiliary_records()]
         )
+        dense_query = self.embedding.embed_query(query)
+        indices, values = encode_query(query)
+
+        if hybrid and self.sparse_enabled and indices:
+            candidates = offset + limit
+            dense = models.Prefetch(
+                query=dense_query,
+                filter=query_filter,
+                limit=candidates,
+                score_threshold=score_threshold,
+                params=search_params()
+            )
+            keyword = models.Prefetch(
+                query=models.SparseVector(indices=indices, values=values),
+                using=SPARSE_VECTOR_NAME,
+                filter=query_filter,
+                limit=candidates
+            )
+            if score_threshold is not None:
+                # Keyword matches are only ranked among turns that pass the dense threshold,
+                # so no fused result falls below it
+                keyword.prefetch = [
+                    dense.model_copy(update={"limit": candidates * HYBRID_DENSE_POOL_FACTOR})
+                ]
+            response = self.client.query_points(
+                collection_name=self._collection_for(tenant_id),
+                prefetch=[dense, keyword],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=limit,
+                offset=offset,
+                with_payload=HISTORY_PAYLOAD_FIELDS,
+                with_vectors=False
+            )
+        else:
+            response = self.client.query_points(
+                collection_name=self._collection_for(tenant_id),
+                query=dense_query,
+                query_filter=query_filter,
+                limit=limit,
+                offset=offset,
+                score_threshold=score_threshold,
+                search_params=search_params(),
+                with_payload=HISTORY_PAYLOAD_FIELDS,
+                with_vectors=False
+            )
 
-        doc.metadata["tenant_id"] = tenant_id
+        results = format_chat_results(response.points)
+        for result, point in zip(results, response.points):
+            result["score"] = point.score
+        return results
 
-        vector_store = QdrantVectorStore(
-            client=self.client,
-            collection_name=self.collection_name,
-            embedding=self.embedding
+    def _scroll_history(
+        self,
+        tenant_id: str,
+        conditions: List[Any],
+        limit: int,
+        offset: int,
+        descending: bool
+    ) -> List[Dict[str, Any]]:
+        from qdrant_client import models
+
+        # Ordered scrolls can't skip by position, so the page is cut out locally.
+        points, _ = self.client.scroll(
+            collection_name=self._collection_for(tenant_id),
+            scroll_filter=models.Filter(
+                must=conditions,
+                must_not=[exclude_auxiliary_records()]
+            ),
+            limit=offset + limit,
+            order_by=models.OrderBy(
+                key="timestamp",
+                direction=models.Direction.DESC if descending else models.Direction.ASC
+            ),
+            with_payload=HISTORY_PAYLOAD_FIELDS,
+            with_vectors=False
         )
+        return format_chat_results(points[offset:])
 
-        return vector_store.add_documents([doc])
-        
     def get_chats_by_user_id(
         self,
         user_id: str,
@@ -99,30 +352,143 @@ class MultiTenantVectorStore:
         limit: int = 100,
         offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """Get all chat messages for a specific user, with pagination"""
-        response = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="metadata.tenant_id",
-                        match=models.MatchValue(value=tenant_id)
-                    ),
-                    models.FieldCondition(
-                        key="metadata.user_id",
-                        match=models.MatchValue(value=str(user_id))
-                    )
-            ]),
+        """Get all chat messages for a specific user, newest first, with pagination"""
+        from qdrant_client import models
+
+        return self._scroll_history(
+            tenant_id,
+            conditions=[
+                models.FieldCondition(
+                    key="metadata.tenant_id",
+                    match=models.MatchValue(value=tenant_id)
+                ),
+                models.FieldCondition(
+                    key="metadata.user_id",
+                    match=models.MatchValue(value=str(user_id))
+                )
+            ],
             limit=limit,
             offset=offset,
-            with_payload=True,
-            with_vectors=False
+            descending=True
         )
-
-        results = format_chat_results(response[0])
-        results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        return results
         
+    def iter_history(
+        self,
+        tenant_id: str,
+        user_id: Optional[str] = None,
+        batch_size: int = 256
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream every conversation turn of a tenant (or one of its users) as export records."""
+        return iter_history_records(self.client, self._collection_for(tenant_id), tenant_id, user_id, batch_size)
+
+    def list_chat_sessions(
+        self,
+        tenant_id: str,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List a user's chats, most recently active first, with their latest turn and turn count.
+
+        With CHAT_SESSION_RECORDS the page is one ordered scroll over the session
+        records kept up to date by ``store_conversation``; otherwise the turns are
+        grouped by chat id. Turn counts come from one facet query over the page's chats.
+
+        Returns:
+            The page of chats and the cursor of the next page (None on the last page)
+        """
+        from qdrant_client import models
+
+        before, skip = (None, 0)
+        if cursor:
+            before_text, _, skip_text = cursor.partition(":")
+            before, skip = float(before_text), int(skip_text)
+
+        user_conditions = [
+            models.FieldCondition(
+                key="metadata.tenant_id",
+                match=models.MatchValue(value=tenant_id)
+            ),
+            models.FieldCondition(
+                key="metadata.user_id",
+                match=models.MatchValue(value=str(user_id))
+            )
+        ]
+
+        collection_name = self._collection_for(tenant_id)
+        if settings.CHAT_SESSION_RECORDS:
+            conditions = user_conditions + [
+                models.FieldCondition(key="record_type", match=models.MatchValue(value=SESSION_RECORD_TYPE))
+            ]
+            if before is not None:
+                conditions.append(models.FieldCondition(key="last_timestamp", range=models.Range(lt=before)))
+            points, _ = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=models.Filter(must=conditions),
+                limit=limit + 1,
+                order_by=models.OrderBy(key="last_timestamp", direction=models.Direction.DESC),
+                with_payload=True,
+                with_vectors=False
+            )
+            sessions = [format_session_result(point.payload) for point in points]
+        else:
+            # Groups can't resume from a cursor, so earlier pages are skipped by position.
+            response = self.client.query_points_groups(
+                collection_name=collection_name,
+                group_by="metadata.chat_id",
+                query=models.OrderByQuery(
+                    order_by=models.OrderBy(key="timestamp", direction=models.Direction.DESC)
+                ),
+                query_filter=models.Filter(must=user_conditions, must_not=[exclude_auxiliary_records()]),
+                group_size=1,
+                limit=skip + limit + 1,
+                with_payload=HISTORY_PAYLOAD_FIELDS
+            )
+            sessions = [format_session_result(group.hits[0].payload) for group in response.groups[skip:]]
+
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
+        if sessions:
+            counts = self.client.facet(
+                collection_name=collection_name,
+                key="metadata.chat_id",
+                facet_filter=models.Filter(
+                    must=user_conditions + [
+                        models.FieldCondition(
+                            key="metadata.chat_id",
+                            match=models.MatchAny(any=[session["chat_id"] for session in sessions])
+                        )
+                    ],
+                    must_not=[exclude_auxiliary_records()]
+                ),
+                limit=len(sessions),
+                exact=True
+            )
+            turn_counts = {hit.value: hit.count for hit in counts.hits}
+            for session in sessions:
+                session["turn_count"] = turn_counts.get(session["chat_id"], 0)
+
+        next_cursor = f"{sessions[-1]['updated_at']!r}:{skip + len(sessions)}" if has_more else None
+        return sessions, next_cursor
+
+    def _chat_conditions(self, chat_id: str, tenant_id: str, user_id: str) -> List[Any]:
+        from qdrant_client import models
+
+        return [
+            models.FieldCondition(
+                key="metadata.tenant_id",
+                match=models.MatchValue(value=tenant_id)
+            ),
+            models.FieldCondition(
+                key="metadata.user_id",
+                match=models.MatchValue(value=str(user_id))
+            ),
+            models.FieldCondition(
+                key="metadata.chat_id",
+                match=models.MatchValue(value=chat_id)
+            )
+        ]
+
     def get_chat_by_id(
         self,
         chat_id: str,
@@ -131,30 +497,243 @@ class MultiTenantVectorStore:
         limit: int = 100,
         offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """Get all messages for a specific chat ID belonging to a user"""
-        response = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="metadata.tenant_id",
-                        match=models.MatchValue(value=tenant_id)
-                    ),
-                    models.FieldCondition(
-                        key="metadata.user_id",
-                        match=models.MatchValue(value=str(user_id))
-                    ),
-                    models.FieldCondition(
-                        key="metadata.chat_id",
-                        match=models.MatchValue(value=chat_id)
-                    )
-            ]),
+        """Get all messages for a specific chat ID belonging to a user, oldest first"""
+        return self._scroll_history(
+            tenant_id,
+            conditions=self._chat_conditions(chat_id, tenant_id, user_id),
             limit=limit,
             offset=offset,
+            descending=False
+        )
+
+    def get_chat_turns_since(
+        self,
+        chat_id: str,
+        tenant_id: str,
+        user_id: str,
+        since: Optional[float] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get the messages of a chat newer than the epoch timestamp ``since``, oldest first.
+
+        Served from the in-process turn cache when it holds all of them and the chat's
+        session record shows no newer turn (written by another worker); otherwise the
+        chat's recent turns are loaded into the cache with one query.
+        """
+        key = (tenant_id, str(user_id), chat_id)
+        if settings.CHAT_SESSION_RECORDS and self._chat_cache.contains(key):
+            records = self.client.retrieve(
+                collection_name=self._collection_for(tenant_id),
+                ids=[session_point_id(chat_id, tenant_id, str(user_id))],
+                with_payload=["last_timestamp"],
+                with_vectors=False
+            )
+            self._check_cached_chat(key, records[0].payload if records else None)
+        return self._turns_since(chat_id, tenant_id, user_id, since, limit)
+
+    def get_chat_context(
+        self,
+        chat_id: str,
+        tenant_id: str,
+        user_id: str,
+        limit: int = 100
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The rolling summary record of a chat (if any) and the turns after it, oldest first.
+
+        The summary and session records are read with one lookup by id. When the turn
+        cache holds the chat and the session record shows no newer turn, that lookup is
+        the only request to Qdrant; otherwise the chat's recent turns are loaded too.
+        """
+        key = (tenant_id, str(user_id), chat_id)
+        ids = [summary_point_id(chat_id, tenant_id, str(user_id))]
+        if settings.CHAT_SESSION_RECORDS:
+            ids.append(session_point_id(chat_id, tenant_id, str(user_id)))
+        records = self.client.retrieve(
+            collection_name=self._collection_for(tenant_id),
+            ids=ids,
             with_payload=True,
             with_vectors=False
         )
+        payloads = {record.payload.get("record_type"): record.payload for record in records}
+        summary = payloads.get(SUMMARY_RECORD_TYPE)
+        if settings.CHAT_SESSION_RECORDS:
+            self._check_cached_chat(key, payloads.get(SESSION_RECORD_TYPE))
 
-        results = format_chat_results(response[0])
-        results.sort(key=lambda x: x.get("timestamp", ""))
-        return results
+        since = summary["summarized_until"] if summary else None
+        return summary, self._turns_since(chat_id, tenant_id, user_id, since, limit)
+
+    def _check_cached_chat(self, key: Tuple[str, str, str], session: Optional[Dict[str, Any]]) -> None:
+        """Drop a cached chat that lacks turns its session record's ``last_timestamp`` shows."""
+        cached, newest = self._chat_cache.newest(key)
+        # Without a session record no turn was stored since session records were enabled
+        if not cached or session is None or session.get("last_timestamp") is None:
+            return
+        if newest is None or session["last_timestamp"] > newest:
+            self._chat_cache.invalidate(key)
+
+    def _turns_since(
+        self,
+        chat_id: str,
+        tenant_id: str,
+        user_id: str,
+        since: Optional[float],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        from qdrant_client import models
+
+        cached = self._chat_cache.turns_since((tenant_id, str(user_id), chat_id), since, limit)
+        if cached is not None:
+            return cached
+        if self._chat_cache.enabled:
+            turns, complete = self._load_recent_turns(chat_id, tenant_id, user_id)
+            selected = ChatTurnCache.select(turns, complete, since, limit)
+            if selected is not None:
+                return selected
+
+        conditions = self._chat_conditions(chat_id, tenant_id, user_id)
+        if since is not None:
+            conditions.append(models.FieldCondition(key="timestamp", range=models.Range(gt=since)))
+        return self._scroll_history(tenant_id, conditions=conditions, limit=limit, offset=0, descending=False)
+
+    def _load_recent_turns(self, chat_id: str, tenant_id: str, user_id: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """Read the newest turns of a chat into the turn cache; returns them oldest first and whether that's all."""
+        newest = self._scroll_history(
+            tenant_id,
+            conditions=self._chat_conditions(chat_id, tenant_id, user_id),
+            limit=self._chat_cache.turns_per_chat + 1,
+            offset=0,
+            descending=True
+        )
+        complete = len(newest) <= self._chat_cache.turns_per_chat
+        turns = newest[:self._chat_cache.turns_per_chat][::-1]
+        self._chat_cache.put((tenant_id, str(user_id), chat_id), turns, complete)
+        return turns, complete
+
+    def prefetch_chat(self, chat_id: str, tenant_id: str, user_id: str) -> None:
+        """Load a chat's recent turns into the turn cache unless they are cached already."""
+        if self._chat_cache.enabled and not self._chat_cache.contains((tenant_id, str(user_id), chat_id)):
+            self._load_recent_turns(chat_id, tenant_id, user_id)
+
+    def count_turns(
+        self,
+        tenant_id: str,
+        user_id: str,
+        chat_id: Optional[str] = None,
+        exact: Optional[bool] = None
+    ) -> int:
+        """Total number of a user's turns (in one chat, if given), for paginated history responses.
+
+        Counted by Qdrant from the tenant, user and chat payload indexes, exactly or
+        approximately (HISTORY_TOTAL_EXACT by default). Totals are cached per user for
+        HISTORY_TOTAL_CACHE_SECONDS and dropped when this process stores a turn of the user;
+        expired ones are evicted as new totals are cached.
+        """
+        from qdrant_client import models
+
+        exact = settings.HISTORY_TOTAL_EXACT if exact is None else exact
+        user_key = (tenant_id, str(user_id))
+        key = (chat_id, exact)
+        cached = self._total_cache.get(user_key, {}).get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        if chat_id is None:
+            conditions = [
+                models.FieldCondition(
+                    key="metadata.tenant_id",
+                    match=models.MatchValue(value=tenant_id)
+                ),
+                models.FieldCondition(
+                    key="metadata.user_id",
+                    match=models.MatchValue(value=str(user_id))
+                )
+            ]
+        else:
+            conditions = self._chat_conditions(chat_id, tenant_id, user_id)
+        total = self.client.count(
+            collection_name=self._collection_for(tenant_id),
+            count_filter=models.Filter(must=conditions, must_not=[exclude_auxiliary_records()]),
+            exact=exact
+        ).count
+
+        now = time.monotonic()
+        self._evict_expired_totals(now)
+        self._total_cache.setdefault(user_key, {})[key] = (now + settings.HISTORY_TOTAL_CACHE_SECONDS, total)
+        self._total_cache.move_to_end(user_key)
+        return total
+
+    def _evict_expired_totals(self, now: float) -> None:
+        """Drop users whose cached totals have all expired.
+
+        Every total lives for the same time and a user moves to the end when one is
+        cached, so those users are at the front.
+        """
+        while self._total_cache:
+            user_key, totals = next(iter(self._total_cache.items()))
+            if any(expires_at > now for expires_at, _ in totals.values()):
+                return
+            del self._total_cache[user_key]
+
+    def count_chat_turns_since(
+        self,
+        chat_id: str,
+        tenant_id: str,
+        user_id: str,
+        since: Optional[float] = None
+    ) -> int:
+        """Count the messages of a chat newer than the epoch timestamp ``since``"""
+        from qdrant_client import models
+
+        conditions = self._chat_conditions(chat_id, tenant_id, user_id)
+        conditions.append(
+            models.FieldCondition(key="timestamp", range=models.Range(gt=since if since is not None else 0))
+        )
+        return self.client.count(
+            collection_name=self._collection_for(tenant_id),
+            count_filter=models.Filter(must=conditions),
+            exact=True
+        ).count
+
+    def get_chat_summary(self, chat_id: str, tenant_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the rolling summary record of a chat, if one has been written"""
+        points = self.client.retrieve(
+            collection_name=self._collection_for(tenant_id),
+            ids=[summary_point_id(chat_id, tenant_id, user_id)],
+            with_payload=True,
+            with_vectors=False
+        )
+        return points[0].payload if points else None
+
+    def store_chat_summary(
+        self,
+        chat_id: str,
+        tenant_id: str,
+        user_id: str,
+        summary: str,
+        summarized_until: float,
+        summarized_turns: int
+    ) -> None:
+        """Create or replace the rolling summary record of a chat"""
+        from qdrant_client import models
+
+        self.client.upsert(
+            collection_name=self._collection_for(tenant_id),
+            points=[
+                models.PointStruct(
+                    id=summary_point_id(chat_id, tenant_id, user_id),
+                    vector=self.embedding.embed_query(summary),
+                    payload={
+                        "record_type": SUMMARY_RECORD_TYPE,
+                        "summary": summary,
+                        "summarized_until": summarized_until,
+                        "summarized_turns": summarized_turns,
+                        "updated_at": time.time(),
+                        "metadata": {
+                            "tenant_id": tenant_id,
+                            "user_id": str(user_id),
+                            "chat_id": chat_id
+                        }
+                    }
+                )
+            ]
+        )
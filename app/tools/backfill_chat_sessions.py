@@ -0,0 +1,116 @@
+"""
+Create the session records of chats written before CHAT_SESSION_RECORDS.
+
+The chat list reads one session record per chat, which ``store_conversation``
+keeps up to date. For chats that predate it, this tool walks every tenant and
+user (facet queries on the indexed metadata), takes each chat's latest turn
+with a grouped query and writes the missing session records. Existing records
+are left alone, so it is safe to run while the service is writing. Tenants
+with a dedicated collection (app.tools.move_tenant) are backfilled as well.
+
+Usage:
+    python -m app.tools.backfill_chat_sessions [--collection multi_tenant_chat_history] [--dry-run]
+"""
+import argparse
+import uuid
+
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import (
+    build_session_payload,
+    dedicated_tenant_collections,
+    exclude_auxiliary_records,
+    facet_counts,
+    get_qdrant_client,
+    session_point_id,
+)
+
+logger = setup_logger(__name__)
+
+
+def _facet(client: QdrantClient, collection_name: str, key: str, conditions) -> dict:
+    turns = models.Filter(must=conditions, must_not=[exclude_auxiliary_records()])
+    return facet_counts(client, collection_name, key, turns)
+
+
+def backfill_user(client: QdrantClient, collection_name: str, tenant_id: str, user_id: str, dry_run: bool) -> int:
+    """Write the missing session records of one user's chats and return how many."""
+    conditions = [
+        models.FieldCondition(key="metadata.tenant_id", match=models.MatchValue(value=tenant_id)),
+        models.FieldCondition(key="metadata.user_id", match=models.MatchValue(value=user_id)),
+    ]
+    chats = _facet(client, collection_name, "metadata.chat_id", conditions)
+    if not chats:
+        return 0
+
+    existing = {
+        uuid.UUID(str(point.id)).hex
+        for point in client.retrieve(
+            collection_name,
+            ids=[session_point_id(chat_id, tenant_id, user_id) for chat_id in chats],
+            with_payload=False
+        )
+    }
+    missing = [chat_id for chat_id in chats if session_point_id(chat_id, tenant_id, user_id) not in existing]
+    if not missing or dry_run:
+        return len(missing)
+
+    response = client.query_points_groups(
+        collection_name=collection_name,
+        group_by="metadata.chat_id",
+        query=models.OrderByQuery(order_by=models.OrderBy(key="timestamp", direction=models.Direction.DESC)),
+        query_filter=models.Filter(
+            must=conditions + [
+                models.FieldCondition(key="metadata.chat_id", match=models.MatchAny(any=missing))
+            ],
+            must_not=[exclude_auxiliary_records()]
+        ),
+        group_size=1,
+        limit=len(missing),
+        with_payload=True,
+        with_vectors=True
+    )
+    points = []
+    for group in response.groups:
+        latest = group.hits[0]
+        points.append(
+            models.PointStruct(
+                id=session_point_id(group.id, tenant_id, user_id),
+                vector=latest.vector[""] if isinstance(latest.vector, dict) else latest.vector,
+                payload=build_session_payload(latest.payload)
+            )
+        )
+    if points:
+        client.upsert(collection_name=collection_name, points=points)
+    return len(points)
+
+
+def backfill_chat_sessions(client: QdrantClient, collection_name: str, dry_run: bool = False) -> int:
+    """Backfill every tenant and user and return the number of session records written."""
+    written = 0
+    for tenant_id in sorted(_facet(client, collection_name, "metadata.tenant_id", [])):
+        tenant = [models.FieldCondition(key="metadata.tenant_id", match=models.MatchValue(value=tenant_id))]
+        for user_id in sorted(_facet(client, collection_name, "metadata.user_id", tenant)):
+            written += backfill_user(client, collection_name, tenant_id, user_id, dry_run)
+        logger.info(f"Tenant {tenant_id}: {written} session records {'to write' if dry_run else 'written'} so far")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.CHAT_COLLECTION_NAME)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    written = sum(
+        backfill_chat_sessions(client, collection_name, args.dry_run)
+        for collection_name in [args.collection, *sorted(dedicated_tenant_collections(client, args.collection))]
+    )
+    logger.info(f"Done: {written} session records {'to write' if args.dry_run else 'written'}")
+
+
+if __name__ == "__main__":
+    main()
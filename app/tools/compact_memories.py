@@ -0,0 +1,262 @@
+"""
+Compact the mem0 memory collection per user.
+
+Over time mem0 stores near-duplicate and superseded facts for the same user
+("Lives in New York", "User lives in NYC"). This job walks the collection one
+user at a time, clusters the user's memory vectors greedily from newest to
+oldest and deletes every memory whose cosine similarity to a newer kept memory
+is above the threshold, so the most recent wording of a fact wins.
+
+Users whose memories haven't changed since their last compaction are skipped
+(state is kept in ``--state-file``). ``--users-per-second`` rate-limits the job
+so it doesn't compete with live searches. Each run reports the points removed
+and the median search latency of the compacted users before and after.
+
+Usage:
+    python -m app.tools.compact_memories [--threshold 0.92] [--users-per-second 2] [--dry-run]
+    python -m app.tools.compact_memories --interval 3600   # keep running every hour
+"""
+import argparse
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import get_qdrant_client
+
+logger = setup_logger(__name__)
+
+SEARCH_SAMPLES = 5
+
+
+@dataclass
+class CompactionReport:
+    users_seen: int = 0
+    users_compacted: int = 0
+    points_before: int = 0
+    points_removed: int = 0
+    latency_before_ms: List[float] = field(default_factory=list)
+    latency_after_ms: List[float] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        before = statistics.median(self.latency_before_ms) if self.latency_before_ms else 0.0
+        after = statistics.median(self.latency_after_ms) if self.latency_after_ms else 0.0
+        return (
+            f"users={self.users_seen} compacted={self.users_compacted} "
+            f"points_removed={self.points_removed}/{self.points_before} "
+            f"search_latency_ms={before:.2f}->{after:.2f}"
+        )
+
+
+def _memory_time(payload: Dict) -> float:
+    value = payload.get("updated_at") or payload.get("created_at")
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class MemoryCompactor:
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        threshold: float,
+        batch_size: int = 256,
+        dry_run: bool = False
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def list_users(self) -> Set[str]:
+        """Distinct user ids in the collection, streamed with payload-only scrolls."""
+        users = set()
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=["user_id"],
+                with_vectors=False
+            )
+            users.update(point.payload["user_id"] for point in points if point.payload.get("user_id"))
+            if offset is None:
+                return users
+
+    def _user_filter(self, user_id: str) -> models.Filter:
+        return models.Filter(must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))])
+
+    def load_user_points(self, user_id: str) -> List[models.Record]:
+        records = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._user_filter(user_id),
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=["data", "created_at", "updated_at"],
+                with_vectors=True
+            )
+            records.extend(points)
+            if offset is None:
+                return records
+
+    def find_redundant(self, records: List[models.Record]) -> List[str]:
+        """Ids of memories that are near-duplicates of a newer memory of the same user."""
+        if len(records) < 2:
+            return []
+        records = sorted(records, key=lambda record: _memory_time(record.payload), reverse=True)
+        vectors = np.asarray([record.vector for record in records], dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+
+        kept: List[int] = []
+        redundant = []
+        for index in range(len(records)):
+            if kept and float(np.max(vectors[kept] @ vectors[index])) >= self.threshold:
+                redundant.append(records[index].id)
+            else:
+                kept.append(index)
+        return redundant
+
+    def measure_search_ms(self, records: List[models.Record], user_id: str) -> float:
+        """Median latency of user-filtered searches using the user's own vectors as queries."""
+        timings = []
+        for record in records[:SEARCH_SAMPLES]:
+            started = time.perf_counter()
+            self.client.query_points(
+                collection_name=self.collection_name,
+                query=record.vector,
+                query_filter=self._user_filter(user_id),
+                limit=10,
+                with_payload=False
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings) if timings else 0.0
+
+    def compact_user(self, user_id: str, report: CompactionReport) -> Optional[float]:
+        """Compact one user's memories and return the newest memory time seen."""
+        records = self.load_user_points(user_id)
+        report.points_before += len(records)
+        if not records:
+            return None
+
+        redundant = self.find_redundant(records)
+        if redundant:
+            report.latency_before_ms.append(self.measure_search_ms(records, user_id))
+            if not self.dry_run:
+                for start in range(0, len(redundant), self.batch_size):
+                    self.client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=models.PointIdsList(points=redundant[start:start + self.batch_size])
+                    )
+            redundant_ids = set(redundant)
+            remaining = [record for record in records if record.id not in redundant_ids]
+            report.latency_after_ms.append(self.measure_search_ms(remaining, user_id))
+            report.users_compacted += 1
+            report.points_removed += len(redundant)
+            logger.info(f"User {user_id}: {'would remove' if self.dry_run else 'removed'} "
+                        f"{len(redundant)} of {len(records)} memories")
+
+        return max(_memory_time(record.payload) for record in records)
+
+    def run(self, state: Dict[str, float], users_per_second: float) -> CompactionReport:
+        """Compact every user whose memories changed since the time recorded in ``state``."""
+        report = CompactionReport()
+        interval = 1.0 / users_per_second if users_per_second > 0 else 0.0
+        for user_id in sorted(self.list_users()):
+            report.users_seen += 1
+            started = time.monotonic()
+
+            newest = self.compact_user_if_changed(user_id, state.get(user_id), report)
+            if newest is not None and not self.dry_run:
+                state[user_id] = newest
+
+            elapsed = time.monotonic() - started
+            if elapsed < interval:
+                time.sleep(interval - elapsed)
+        return report
+
+    def compact_user_if_changed(
+        self,
+        user_id: str,
+        last_compacted: Optional[float],
+        report: CompactionReport
+    ) -> Optional[float]:
+        if last_compacted is not None:
+            newest = self._newest_memory_time(user_id)
+            if newest is not None and newest <= last_compacted:
+                logger.debug(f"User {user_id}: memories unchanged since last compaction")
+                return None
+        return self.compact_user(user_id, report)
+
+    def _newest_memory_time(self, user_id: str) -> Optional[float]:
+        newest = None
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._user_filter(user_id),
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=["created_at", "updated_at"],
+                with_vectors=False
+            )
+            for point in points:
+                newest = max(newest or 0.0, _memory_time(point.payload))
+            if offset is None:
+                return newest
+
+
+def load_state(path: Path) -> Dict[str, float]:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+def save_state(path: Path, state: Dict[str, float]) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state))
+    tmp_path.replace(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.MEMORY_COLLECTION_NAME)
+    parser.add_argument("--threshold", type=float, default=settings.MEMORY_COMPACTION_SIMILARITY)
+    parser.add_argument("--users-per-second", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--state-file", type=Path, default=Path(".memory_compaction.json"))
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 runs once)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    compactor = MemoryCompactor(client, args.collection, args.threshold, args.batch_size, args.dry_run)
+    while True:
+        state = load_state(args.state_file)
+        report = compactor.run(state, args.users_per_second)
+        if not args.dry_run:
+            save_state(args.state_file, state)
+        logger.info(f"Memory compaction {'(dry run) ' if args.dry_run else ''}finished: {report}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Export a tenant's or user's chat history as NDJSON.
+
+Streams the conversation turns with scroll cursors, one record per line
+(id, tenant_id, user_id, chat_id, user_message, assistant_message and epoch
+timestamp), optionally gzip-compressed. Records are written as they are read,
+so memory use is constant regardless of the export size. The export only reads
+(no collection is created or changed) and logs to stderr, so stdout carries
+nothing but the export.
+
+Usage:
+    python -m app.tools.export_history --tenant acme [--user 42] [--gzip] [--output history.ndjson.gz]
+"""
+import argparse
+import sys
+import time
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+from app.utils.ndjson import iter_ndjson
+from app.utils.qdrant import get_qdrant_client, iter_history_records, tenant_history_collection
+
+logger = setup_logger(__name__, stream=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant", required=True)
+    parser.add_argument("--user", help="Only export this user's history")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", default="-", help="File to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    collection_name = tenant_history_collection(client, settings.CHAT_COLLECTION_NAME, args.tenant)
+
+    records = iter_history_records(client, collection_name, args.tenant, args.user, args.batch_size)
+    written = 0
+    started = time.perf_counter()
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in iter_ndjson(records, compress=args.gzip):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    logger.info(f"Exported {written} bytes in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Rewrite legacy chat-history points into the structured turn payload.
+
+Older points store a turn as ``page_content = "User: ...\\nAssistant: ..."`` with a
+string timestamp in ``metadata``. This tool streams the points that have no
+``user_message`` field yet, in batches, and overwrites their payload with
+``user_message``, ``assistant_message`` and an epoch ``timestamp``. Vectors are
+left untouched, so nothing is re-embedded.
+
+Usage:
+    python -m app.tools.migrate_turn_payloads [--collection multi_tenant_chat_history] [--batch-size 256] [--dry-run]
+"""
+import argparse
+import time
+
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import build_turn_payload, exclude_auxiliary_records, get_qdrant_client, parse_legacy_turn
+
+logger = setup_logger(__name__)
+
+
+def migrate_turn_payloads(
+    client: QdrantClient,
+    collection_name: str,
+    batch_size: int = 256,
+    dry_run: bool = False
+) -> int:
+    """Migrate legacy points in ``collection_name`` and return how many were rewritten."""
+    legacy_filter = models.Filter(
+        must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="user_message"))],
+        must_not=[exclude_auxiliary_records()]
+    )
+
+    migrated = 0
+    offset = None
+    started = time.perf_counter()
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=legacy_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        if not points:
+            break
+
+        operations = []
+        for point in points:
+            user_msg, assistant_msg, timestamp = parse_legacy_turn(point.payload)
+            if timestamp is None:
+                logger.warning(f"Point {point.id} has no parsable timestamp, using 0")
+                timestamp = 0.0
+            payload = build_turn_payload(
+                user_msg,
+                assistant_msg,
+                point.payload.get("metadata") or {},
+                timestamp=timestamp
+            )
+            operations.append(
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(payload=payload, points=[point.id])
+                )
+            )
+
+        if not dry_run:
+            client.batch_update_points(collection_name=collection_name, update_operations=operations)
+        migrated += len(operations)
+        logger.info(f"{'Would migrate' if dry_run else 'Migrated'} {migrated} points "
+                    f"({migrated / (time.perf_counter() - started):.0f} points/s)")
+
+        if offset is None:
+            break
+
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.CHAT_COLLECTION_NAME)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    migrated = migrate_turn_payloads(client, args.collection, args.batch_size, args.dry_run)
+    logger.info(f"Done: {migrated} points {'to migrate' if args.dry_run else 'migrated'}")
+
+
+if __name__ == "__main__":
+    main()
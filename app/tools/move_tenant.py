@@ -0,0 +1,249 @@
+"""
+Move a tenant between the shared chat-history collection and a dedicated one, online.
+
+Every tenant starts in the shared collection, isolated by its indexed
+``metadata.tenant_id``. A tenant large enough to dominate the shared HNSW graph
+can be given a collection of its own, named ``<collection>__tenant_<slug>`` and
+reached through an alias of the same form; ``MultiTenantVectorStore`` routes a
+tenant to its alias when it exists (checked every TENANT_ROUTING_REFRESH_SECONDS).
+
+A move runs while the service keeps serving the tenant:
+
+1. The tenant's points (turns, summaries and sessions) are copied with
+   ``app.tools.reindex``, checkpointed so an interrupted move resumes.
+2. The alias is created (``--to dedicated``) or deleted (``--to shared``),
+   which flips the routing of every worker within one refresh interval.
+3. After ``--settle`` seconds, the points written to the old location meanwhile
+   are copied over; summary and session records keep their newest version.
+   Points deleted from the old location since they were copied (retention, user
+   deletes) are deleted from the new one: a point of the new location that the
+   old one lacks and that was written before the flip must have been deleted.
+   This relies on the service's clocks roughly agreeing with the tool's.
+4. The tenant's points are deleted from the old location (unless ``--keep-source``).
+
+``--auto`` moves every tenant of the shared collection holding at least
+TENANT_DEDICATED_MIN_POINTS points.
+
+Usage:
+    python -m app.tools.move_tenant --tenant acme --to dedicated
+    python -m app.tools.move_tenant --tenant acme --to shared
+    python -m app.tools.move_tenant --auto [--dry-run]
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.tools.reindex import reindex
+from app.utils.logger import setup_logger
+from app.utils.qdrant import (
+    alias_target,
+    ensure_collection_alias,
+    facet_counts,
+    get_qdrant_client,
+    resolve_collection_name,
+    tenant_collection_name,
+    versioned_collection_name,
+)
+
+logger = setup_logger(__name__)
+
+
+def tenant_filter(tenant_id: str) -> models.Filter:
+    return models.Filter(
+        must=[models.FieldCondition(key="metadata.tenant_id", match=models.MatchValue(value=tenant_id))]
+    )
+
+
+def _record_time(payload: Dict[str, Any]) -> float:
+    return payload.get("last_timestamp") or payload.get("updated_at") or payload.get("timestamp") or 0.0
+
+
+def catch_up(client: QdrantClient, source: str, target: str, tenant_id: str, batch_size: int = 256) -> int:
+    """Copy the tenant's points of ``source`` that ``target`` lacks or holds an older version of."""
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            scroll_filter=tenant_filter(tenant_id),
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        present = {
+            record.id: record.payload
+            for record in client.retrieve(target, ids=[record.id for record in records], with_payload=True)
+        }
+        points = [
+            models.PointStruct(id=record.id, vector=record.vector, payload=record.payload)
+            for record in records
+            if record.id not in present or _record_time(record.payload) > _record_time(present[record.id])
+        ]
+        if points:
+            client.upsert(collection_name=target, points=points, wait=True)
+            copied += len(points)
+        if offset is None:
+            return copied
+
+
+def drop_deleted(client: QdrantClient, source: str, target: str, tenant_id: str, before: float, batch_size: int = 256) -> int:
+    """Delete the tenant's points from ``target`` that ``source`` no longer has and that were written before ``before``."""
+    deleted = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=target,
+            scroll_filter=tenant_filter(tenant_id),
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        present = {record.id for record in client.retrieve(source, ids=[record.id for record in records])}
+        gone = [
+            record.id
+            for record in records
+            if record.id not in present and _record_time(record.payload) < before
+        ]
+        if gone:
+            client.delete(collection_name=target, points_selector=models.PointIdsList(points=gone), wait=True)
+            deleted += len(gone)
+        if offset is None:
+            return deleted
+
+
+def _move(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    tenant_id: str,
+    flip: Callable[[], None],
+    settle_seconds: float,
+    keep_source: bool,
+    scroll_filter: Optional[models.Filter],
+    workers: int
+) -> None:
+    checkpoint = Path(f".move_tenant_{source}_{target}.json")
+    report = reindex(client, source, target, workers=workers, checkpoint=checkpoint, scroll_filter=scroll_filter)
+    logger.info(f"Copied tenant {tenant_id} from {source} to {target}: {report}")
+
+    flipped_at = time.time()
+    flip()
+    logger.info(f"Routing of tenant {tenant_id} switched to {target}; settling for {settle_seconds:.0f}s")
+    time.sleep(settle_seconds)
+
+    caught_up = catch_up(client, source, target, tenant_id)
+    dropped = drop_deleted(client, source, target, tenant_id, before=flipped_at)
+    logger.info(f"Copied {caught_up} points written to {source} during the move and removed {dropped} deleted there")
+
+    if not keep_source:
+        if scroll_filter is None:
+            client.delete_collection(source)
+        else:
+            client.delete(
+                collection_name=source,
+                points_selector=models.FilterSelector(filter=scroll_filter),
+                wait=True
+            )
+        logger.info(f"Removed tenant {tenant_id} from {source}")
+    checkpoint.unlink(missing_ok=True)
+
+
+def move_to_dedicated(
+    client: QdrantClient,
+    base: str,
+    tenant_id: str,
+    settle_seconds: float,
+    keep_source: bool = False,
+    workers: int = 4
+) -> None:
+    """Move a tenant out of the shared collection behind the alias ``base`` into its own collection."""
+    alias = tenant_collection_name(base, tenant_id)
+    if alias_target(client, alias):
+        logger.info(f"Tenant {tenant_id} already has a dedicated collection")
+        return
+    shared = resolve_collection_name(client, base)
+    target = tenant_collection_name(versioned_collection_name(base), tenant_id)
+    _move(
+        client, shared, target, tenant_id,
+        flip=lambda: ensure_collection_alias(client, alias, target),
+        settle_seconds=settle_seconds,
+        keep_source=keep_source,
+        scroll_filter=tenant_filter(tenant_id),
+        workers=workers
+    )
+
+
+def move_to_shared(
+    client: QdrantClient,
+    base: str,
+    tenant_id: str,
+    settle_seconds: float,
+    keep_source: bool = False,
+    workers: int = 4
+) -> None:
+    """Move a tenant's dedicated collection back into the shared collection behind the alias ``base``."""
+    alias = tenant_collection_name(base, tenant_id)
+    source = alias_target(client, alias)
+    if not source:
+        logger.info(f"Tenant {tenant_id} is already in the shared collection")
+        return
+    shared = resolve_collection_name(client, base)
+    _move(
+        client, source, shared, tenant_id,
+        flip=lambda: client.update_collection_aliases(
+            change_aliases_operations=[
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias))
+            ]
+        ),
+        settle_seconds=settle_seconds,
+        keep_source=keep_source,
+        scroll_filter=None,
+        workers=workers
+    )
+
+
+def tenants_above(client: QdrantClient, base: str, min_points: int) -> List[str]:
+    """Tenants of the shared collection holding at least ``min_points`` points, largest first."""
+    counts = facet_counts(client, resolve_collection_name(client, base), "metadata.tenant_id")
+    return [tenant_id for tenant_id, count in sorted(counts.items(), key=lambda item: -item[1]) if count >= min_points]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.CHAT_COLLECTION_NAME, help="Alias of the shared collection")
+    parser.add_argument("--tenant")
+    parser.add_argument("--to", choices=["dedicated", "shared"], default="dedicated")
+    parser.add_argument("--auto", action="store_true", help="Dedicate every tenant above TENANT_DEDICATED_MIN_POINTS")
+    parser.add_argument("--settle", type=float, default=2 * settings.TENANT_ROUTING_REFRESH_SECONDS,
+                        help="Seconds to wait for every worker to pick up the new routing")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--keep-source", action="store_true", help="Leave the tenant's points in the old location")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the tenants --auto would move")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    if args.auto:
+        if settings.TENANT_DEDICATED_MIN_POINTS <= 0:
+            parser.error("--auto needs TENANT_DEDICATED_MIN_POINTS > 0")
+        tenants = tenants_above(client, args.collection, settings.TENANT_DEDICATED_MIN_POINTS)
+        logger.info(f"Tenants above {settings.TENANT_DEDICATED_MIN_POINTS} points: {', '.join(tenants) or 'none'}")
+        if args.dry_run:
+            return
+        for tenant_id in tenants:
+            move_to_dedicated(client, args.collection, tenant_id, args.settle, args.keep_source, args.workers)
+        return
+
+    if not args.tenant:
+        parser.error("--tenant or --auto is required")
+    move = move_to_dedicated if args.to == "dedicated" else move_to_shared
+    move(client, args.collection, args.tenant, args.settle, args.keep_source, args.workers)
+
+
+if __name__ == "__main__":
+    main()
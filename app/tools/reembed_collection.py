@@ -0,0 +1,146 @@
+"""
+Re-embed a collection into a new versioned collection and swap its alias.
+
+Collections are named ``<name>__<model>_<dims>`` and the service reaches them
+through the alias ``<name>``. To change EMBEDDING_MODEL or EMBEDDING_DIMS, this
+tool reindexes the current collection (``app.tools.reindex``) into the versioned
+collection for the new model and size, re-embedding each point's text and keeping
+its id, payload and sparse vector. Progress is checkpointed, so an interrupted run
+resumes where it stopped. A final pass copies points written during the
+migration. ``--swap`` then atomically repoints the alias; restart the service
+with the new settings right after. Tenants moved to a dedicated collection
+(``app.tools.move_tenant``) are re-embedded the same way, each into the dedicated
+collection under the new versioned name, and their aliases are swapped with it.
+
+A collection created before versioning (a plain collection named ``<name>``)
+can't be aliased in place: ``--swap --drop-legacy`` deletes it before creating
+the alias.
+
+Usage:
+    python -m app.tools.reembed_collection --collection multi_tenant_chat_history --dims 512
+    python -m app.tools.reembed_collection --collection general_chat_history --dims 512 --swap
+"""
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.tools.reindex import build_points, reindex
+from app.utils.embeddings import create_embeddings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import (
+    alias_target,
+    dedicated_tenant_collections,
+    get_qdrant_client,
+    resolve_collection_name,
+    versioned_collection_name,
+)
+
+logger = setup_logger(__name__)
+
+
+def copy_missing(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    embedding: Embeddings,
+    batch_size: int = 64
+) -> int:
+    """Copy the points of ``source`` that are missing from ``target`` (written during the copy)."""
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False
+        )
+        present = {point.id for point in client.retrieve(target, ids=[point.id for point in points])}
+        missing = [point.id for point in points if point.id not in present]
+        if missing:
+            records = client.retrieve(source, ids=missing, with_payload=True, with_vectors=True)
+            points = build_points(records, embedding=embedding)
+            if points:
+                client.upsert(collection_name=target, points=points)
+            copied += len(points)
+        if offset is None:
+            return copied
+
+
+def swap_alias(client: QdrantClient, alias: str, target: str, drop_legacy: bool = False) -> None:
+    """Atomically point ``alias`` at ``target``."""
+    operations = []
+    if alias_target(client, alias):
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+    elif client.collection_exists(alias):
+        if not drop_legacy:
+            raise RuntimeError(f"{alias} is a collection, not an alias; pass --drop-legacy to replace it")
+        logger.warning(f"Deleting legacy collection {alias}")
+        client.delete_collection(alias)
+    operations.append(
+        models.CreateAliasOperation(create_alias=models.CreateAlias(collection_name=target, alias_name=alias))
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"Alias {alias} now points to {target}")
+
+
+def reembed(
+    client: QdrantClient,
+    alias: str,
+    source: str,
+    target: str,
+    embedding: Embeddings,
+    args: argparse.Namespace,
+    checkpoint: Optional[Path] = None
+) -> None:
+    """Re-embed the collection ``source`` behind ``alias`` into ``target``, then swap the alias if asked."""
+    if source == target:
+        logger.info(f"{alias} already points to {target}")
+        return
+    report = reindex(
+        client,
+        source,
+        target,
+        embedding=embedding,
+        dims=args.dims,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=checkpoint or Path(f".reembed_{target}.json")
+    )
+    caught_up = copy_missing(client, source, target, embedding, args.batch_size)
+    logger.info(f"Re-embedded {source} into {target}: {report}, {caught_up} written meanwhile")
+
+    if args.swap:
+        swap_alias(client, alias, target, args.drop_legacy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.CHAT_COLLECTION_NAME, help="Alias (logical name)")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--dims", type=int, default=settings.EMBEDDING_DIMS)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", type=Path,
+                        help="Progress file of the shared collection (default .reembed_<target>.json)")
+    parser.add_argument("--swap", action="store_true", help="Repoint the alias once the copy is complete")
+    parser.add_argument("--drop-legacy", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    embedding = create_embeddings(args.model, args.dims)
+    versioned = versioned_collection_name(args.collection, args.model, args.dims)
+    source = resolve_collection_name(client, args.collection)
+    reembed(client, args.collection, source, versioned, embedding, args, args.checkpoint)
+    # Dedicated tenant aliases are "<alias>__tenant_<slug>"; their collections get the same suffix.
+    for tenant_alias, source in sorted(dedicated_tenant_collections(client, args.collection).items()):
+        reembed(client, tenant_alias, source, versioned + tenant_alias[len(args.collection):], embedding, args)
+
+
+if __name__ == "__main__":
+    main()
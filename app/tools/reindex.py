@@ -0,0 +1,289 @@
+"""
+Stream the points of one collection into another, optionally transformed and re-embedded.
+
+Points are read with scroll in id order and written to the target in batches by
+a pool of workers, keeping their ids. Each batch can have its payloads rewritten
+by a transform (a name from ``TRANSFORMS`` or ``package.module:function`` taking
+and returning a payload dict, or None to drop the point) and its dense vectors
+recomputed from the point text with ``--reembed``. The target is created like
+the source (sparse vectors, payload indexes, storage options) when it doesn't
+exist.
+
+The scroll position is checkpointed once every batch before it has been written,
+so an interrupted run resumes without gaps; batches may be written twice, which
+is harmless since upserts are idempotent. ``--dry-run`` reads and transforms
+everything but writes nothing.
+
+Usage:
+    python -m app.tools.reindex --source multi_tenant_chat_history --target chats_v2 [--transform turn-payload]
+    python -m app.tools.reindex --source chats_v2 --target chats_v3 --reembed --dims 512 --workers 8
+"""
+import argparse
+import importlib
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.utils.embeddings import create_embeddings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import (
+    build_turn_payload,
+    dense_vector_params,
+    format_turn_text,
+    get_qdrant_client,
+    hnsw_config,
+    parse_legacy_turn,
+    quantization_config,
+)
+
+logger = setup_logger(__name__)
+
+Transform = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def turn_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite a legacy ``page_content`` turn into the structured turn payload."""
+    if "user_message" in payload or "page_content" not in payload:
+        return payload
+    user_msg, assistant_msg, timestamp = parse_legacy_turn(payload)
+    return build_turn_payload(user_msg, assistant_msg, payload.get("metadata") or {}, timestamp=timestamp or 0.0)
+
+
+TRANSFORMS: Dict[str, Transform] = {
+    "turn-payload": turn_payload,
+}
+
+
+def load_transform(name: str) -> Transform:
+    if name in TRANSFORMS:
+        return TRANSFORMS[name]
+    module_name, _, function_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def point_text(payload: Dict[str, Any]) -> Optional[str]:
+    """Text that was embedded for a chat turn, chat summary or session, or a mem0 memory."""
+    if "user_message" in payload:
+        return format_turn_text(payload["user_message"], payload.get("assistant_message", ""))
+    if "last_user_message" in payload:
+        return format_turn_text(payload["last_user_message"], payload.get("last_assistant_message", ""))
+    for key in ("summary", "data", "page_content"):
+        if payload.get(key):
+            return payload[key]
+    return None
+
+
+def create_collection_like(client: QdrantClient, source: str, target: str, dims: Optional[int] = None) -> None:
+    """Create ``target`` like ``source`` (sparse vectors, payload indexes), optionally with ``dims``-d vectors."""
+    if client.collection_exists(target):
+        return
+    info = client.get_collection(source)
+    vectors = info.config.params.vectors
+    size = dims or (vectors.size if hasattr(vectors, "size") else vectors[""].size)
+    client.create_collection(
+        collection_name=target,
+        vectors_config=dense_vector_params(size),
+        sparse_vectors_config=info.config.params.sparse_vectors,
+        quantization_config=quantization_config(),
+        hnsw_config=hnsw_config(),
+        on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD
+    )
+    for field_name, index in info.payload_schema.items():
+        client.create_payload_index(
+            collection_name=target,
+            field_name=field_name,
+            field_schema=index.params or index.data_type
+        )
+    logger.info(f"Created {target} ({size}-d) from {source}")
+
+
+def build_points(
+    records: List[models.Record],
+    transform: Optional[Transform] = None,
+    embedding: Optional[Embeddings] = None
+) -> List[models.PointStruct]:
+    """Transform and re-embed scrolled records into points for the target collection."""
+    rows: List[Tuple[models.Record, Dict[str, Any]]] = []
+    for record in records:
+        payload = transform(dict(record.payload)) if transform else record.payload
+        if payload is not None:
+            rows.append((record, payload))
+
+    if embedding is not None:
+        rows = [(record, payload) for record, payload in rows if point_text(payload) is not None]
+        dense = embedding.embed_documents([point_text(payload) for _, payload in rows])
+    else:
+        dense = [None] * len(rows)
+
+    points = []
+    for (record, payload), vector in zip(rows, dense):
+        if vector is None:
+            vector = record.vector
+        elif isinstance(record.vector, dict):
+            vector = {**record.vector, "": vector}
+        points.append(models.PointStruct(id=record.id, vector=vector, payload=payload))
+    return points
+
+
+@dataclass
+class ReindexReport:
+    read: int = 0
+    written: int = 0
+    seconds: float = 0.0
+
+    @property
+    def points_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"read={self.read} written={self.written} in {self.seconds:.1f}s ({self.points_per_second:.0f} points/s)"
+
+
+class _Checkpoint:
+    def __init__(self, path: Optional[Path], source: str, target: str):
+        self.path = path
+        self.state = {"source": source, "target": target, "offset": None, "read": 0, "written": 0, "done": False}
+        if path and path.exists():
+            saved = json.loads(path.read_text())
+            if (saved.get("source"), saved.get("target")) == (source, target):
+                self.state = saved
+
+    def save(self) -> None:
+        if self.path:
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.state))
+            tmp_path.replace(self.path)
+
+
+def reindex(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    transform: Optional[Transform] = None,
+    embedding: Optional[Embeddings] = None,
+    dims: Optional[int] = None,
+    batch_size: int = 128,
+    workers: int = 4,
+    checkpoint: Optional[Path] = None,
+    dry_run: bool = False,
+    scroll_filter: Optional[models.Filter] = None
+) -> ReindexReport:
+    """Copy ``source`` into ``target`` and return what was read and written.
+
+    Args:
+        client: Qdrant client
+        source: Collection (or alias) to read
+        target: Collection to write, created like ``source`` if missing
+        transform: Payload transform applied to every point
+        embedding: Recompute dense vectors with this model instead of copying them
+        dims: Dense vector size of a newly created target (default: the source's)
+        batch_size: Points per scroll page and upsert
+        workers: Batches transformed, embedded and upserted concurrently
+        checkpoint: Progress file for resuming; None disables checkpointing
+        dry_run: Read and transform without writing anything
+        scroll_filter: Only copy points matching this filter
+    """
+    progress = _Checkpoint(None if dry_run else checkpoint, source, target)
+    report = ReindexReport(read=progress.state["read"], written=progress.state["written"])
+    if progress.state["done"]:
+        return report
+    if not dry_run:
+        create_collection_like(client, source, target, dims)
+
+    # Local mode (":memory:" or a path) isn't thread-safe; only its client calls are serialized.
+    local = client.init_options.get("location") == ":memory:" or client.init_options.get("path")
+    client_lock = threading.Lock() if local else nullcontext()
+
+    def write(records: List[models.Record]) -> int:
+        if dry_run:
+            return sum(1 for record in records if transform is None or transform(dict(record.payload)) is not None)
+        points = build_points(records, transform, embedding)
+        if points:
+            with client_lock:
+                client.upsert(collection_name=target, points=points, wait=True)
+        return len(points)
+
+    started = time.perf_counter()
+    read_before = report.read
+    # Batches in scroll order, each with the offset to resume from once it and all before it are written.
+    pending: List[Tuple[Future, Any, int]] = []
+
+    def settle(block: bool) -> None:
+        while pending and (block or pending[0][0].done()):
+            future, next_offset, count = pending.pop(0)
+            report.written += future.result()
+            report.read += count
+            progress.state.update(offset=next_offset, read=report.read, written=report.written)
+            progress.save()
+            elapsed = time.perf_counter() - started
+            logger.info(f"{'Read' if dry_run else 'Reindexed'} {report.read} points "
+                        f"({(report.read - read_before) / elapsed:.0f} points/s)")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        offset = progress.state["offset"]
+        while True:
+            with client_lock:
+                records, offset = client.scroll(
+                    collection_name=source,
+                    scroll_filter=scroll_filter,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=not dry_run
+                )
+            if records:
+                pending.append((executor.submit(write, records), offset, len(records)))
+            settle(block=len(pending) >= 2 * workers)
+            if offset is None:
+                break
+        settle(block=True)
+
+    progress.state["done"] = True
+    progress.save()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", required=True)
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--transform", help=f"One of {', '.join(TRANSFORMS)} or package.module:function")
+    parser.add_argument("--reembed", action="store_true", help="Recompute dense vectors from the point text")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--dims", type=int, help="Vector size of the target (default: the source's)")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", type=Path, help="Progress file (default .reindex_<source>_<target>.json)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    dims = args.dims or (settings.EMBEDDING_DIMS if args.reembed else None)
+    embedding = create_embeddings(args.model, dims) if args.reembed else None
+    report = reindex(
+        client,
+        args.source,
+        args.target,
+        transform=load_transform(args.transform) if args.transform else None,
+        embedding=embedding,
+        dims=dims,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=args.checkpoint or Path(f".reindex_{args.source}_{args.target}.json"),
+        dry_run=args.dry_run
+    )
+    logger.info(f"Done{' (dry run)' if args.dry_run else ''}: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Enforce chat-history retention per tenant.
+
+Two policies apply to every tenant, with per-tenant overrides from
+RETENTION_TENANT_POLICIES (e.g. ``{"acme": {"max_age_days": 30}}``):
+
+* ``max_age_days``: turns whose indexed ``timestamp`` is older are deleted, and
+  so are the summary and session records (indexed ``updated_at`` and
+  ``last_timestamp``) of chats inactive since then.
+* ``max_turns_per_chat``: the oldest turns of a chat beyond this count are
+  deleted (the rolling summary keeps their gist).
+
+0 disables a policy. Matching points are found with indexed filters, deleted by
+id in batches, and the job sleeps between batches to stay under
+``--deletes-per-second`` so live queries keep their latency. Every run reports
+the reclaimed points per tenant. Tenants with a dedicated collection
+(app.tools.move_tenant) are covered as well.
+
+Deletes do not reach the service's in-process caches: a chat cached by a worker
+keeps the deleted turns for up to CHAT_CACHE_TTL_SECONDS, and history totals
+stay as they were for up to HISTORY_TOTAL_CACHE_SECONDS.
+
+Usage:
+    python -m app.tools.retention [--dry-run] [--deletes-per-second 500]
+    python -m app.tools.retention --interval 3600   # keep running every hour
+"""
+import argparse
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+from app.utils.qdrant import (
+    SESSION_RECORD_TYPE,
+    SUMMARY_RECORD_TYPE,
+    dedicated_tenant_collections,
+    exclude_auxiliary_records,
+    facet_counts,
+    get_qdrant_client,
+)
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    max_age_days: float = 0
+    max_turns_per_chat: int = 0
+
+
+def tenant_policy(tenant_id: str) -> RetentionPolicy:
+    overrides = settings.RETENTION_TENANT_POLICIES.get(tenant_id, {})
+    return RetentionPolicy(
+        max_age_days=overrides.get("max_age_days", settings.RETENTION_MAX_AGE_DAYS),
+        max_turns_per_chat=int(overrides.get("max_turns_per_chat", settings.RETENTION_MAX_TURNS_PER_CHAT))
+    )
+
+
+def _match(key: str, value: str) -> models.FieldCondition:
+    return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+
+
+_IS_SUMMARY = _match("record_type", SUMMARY_RECORD_TYPE)
+_IS_SESSION = _match("record_type", SESSION_RECORD_TYPE)
+
+
+class RetentionJob:
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        batch_size: int = 256,
+        deletes_per_second: float = 500,
+        dry_run: bool = False
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.deletes_per_second = deletes_per_second
+        self.dry_run = dry_run
+
+    def _facet(self, key: str, conditions: List[models.FieldCondition]) -> Dict[str, int]:
+        turns = models.Filter(must=conditions, must_not=[exclude_auxiliary_records()])
+        return facet_counts(self.client, self.collection_name, key, turns)
+
+    def _delete_ids(self, ids: List) -> None:
+        started = time.monotonic()
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.PointIdsList(points=ids),
+            wait=True
+        )
+        if self.deletes_per_second > 0:
+            remaining = len(ids) / self.deletes_per_second - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _delete_matching(self, points_filter: models.Filter, limit: Optional[int] = None) -> int:
+        """Delete the points matching ``points_filter`` in batches; with ``limit``, only the oldest ones."""
+        if self.dry_run:
+            matching = self.client.count(self.collection_name, count_filter=points_filter, exact=True).count
+            return matching if limit is None else min(matching, limit)
+
+        deleted = 0
+        while limit is None or deleted < limit:
+            batch = self.batch_size if limit is None else min(self.batch_size, limit - deleted)
+            # Deleted points drop out of the filter, so every page is read from the start.
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=points_filter,
+                limit=batch,
+                order_by=None if limit is None else models.OrderBy(key="timestamp", direction=models.Direction.ASC),
+                with_payload=False,
+                with_vectors=False
+            )
+            if not points:
+                break
+            self._delete_ids([point.id for point in points])
+            deleted += len(points)
+        return deleted
+
+    def expire_old_turns(self, tenant_id: str, max_age_days: float) -> int:
+        cutoff = time.time() - max_age_days * 86400
+        tenant = _match("metadata.tenant_id", tenant_id)
+        turns = self._delete_matching(models.Filter(
+            must=[tenant, models.FieldCondition(key="timestamp", range=models.Range(lt=cutoff))],
+            must_not=[exclude_auxiliary_records()]
+        ))
+        summaries = self._delete_matching(models.Filter(
+            must=[tenant, _IS_SUMMARY, models.FieldCondition(key="updated_at", range=models.Range(lt=cutoff))]
+        ))
+        sessions = self._delete_matching(models.Filter(
+            must=[tenant, _IS_SESSION, models.FieldCondition(key="last_timestamp", range=models.Range(lt=cutoff))]
+        ))
+        return turns + summaries + sessions
+
+    def trim_chats(self, tenant_id: str, max_turns: int) -> int:
+        tenant = _match("metadata.tenant_id", tenant_id)
+        trimmed = 0
+        for chat_id, turns in self._facet("metadata.chat_id", [tenant]).items():
+            if turns <= max_turns:
+                continue
+            chat = _match("metadata.chat_id", chat_id)
+            # Chat ids are scoped per user; a shared id is trimmed per user.
+            for user_id, user_turns in self._facet("metadata.user_id", [tenant, chat]).items():
+                if user_turns > max_turns:
+                    trimmed += self._delete_matching(
+                        models.Filter(
+                            must=[tenant, chat, _match("metadata.user_id", user_id)],
+                            must_not=[exclude_auxiliary_records()]
+                        ),
+                        limit=user_turns - max_turns
+                    )
+        return trimmed
+
+    def run(self) -> Counter:
+        """Apply every tenant's policy and return the reclaimed points per tenant."""
+        reclaimed = Counter()
+        for tenant_id in sorted(self._facet("metadata.tenant_id", [])):
+            policy = tenant_policy(tenant_id)
+            if policy.max_age_days > 0:
+                reclaimed[tenant_id] += self.expire_old_turns(tenant_id, policy.max_age_days)
+            if policy.max_turns_per_chat > 0:
+                reclaimed[tenant_id] += self.trim_chats(tenant_id, policy.max_turns_per_chat)
+            if reclaimed[tenant_id]:
+                logger.info(f"Tenant {tenant_id}: {'would reclaim' if self.dry_run else 'reclaimed'} "
+                            f"{reclaimed[tenant_id]} points")
+        return reclaimed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=settings.CHAT_COLLECTION_NAME)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--deletes-per-second", type=float, default=settings.RETENTION_DELETES_PER_SECOND)
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 runs once)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    while True:
+        started = time.perf_counter()
+        reclaimed = Counter()
+        for collection_name in [args.collection, *sorted(dedicated_tenant_collections(client, args.collection))]:
+            job = RetentionJob(client, collection_name, args.batch_size, args.deletes_per_second, args.dry_run)
+            reclaimed.update(job.run())
+        logger.info(f"Retention {'(dry run) ' if args.dry_run else ''}finished in "
+                    f"{time.perf_counter() - started:.1f}s: {sum(reclaimed.values())} points reclaimed "
+                    f"across {len(reclaimed)} tenants")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from typing import Optional, TYPE_CHECKING
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+
+def create_embeddings(model: Optional[str] = None, dims: Optional[int] = None) -> "Embeddings":
+    """OpenAI embedding model, EMBEDDING_MODEL / EMBEDDING_DIMS unless overridden."""
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=model or settings.EMBEDDING_MODEL,
+        api_key=settings.OPENAI_API_KEY,
+        dimensions=dims or settings.EMBEDDING_DIMS
+    )
@@ -1,15 +1,16 @@
 import logging
 import sys
+from typing import Optional, TextIO
 
 
-def setup_logger(name: str) -> logging.Logger:
+def setup_logger(name: str, stream: Optional[TextIO] = None) -> logging.Logger:
     numeric_level = getattr(logging, "INFO", logging.INFO)
 
     logger = logging.getLogger(name)
     logger.setLevel(numeric_level)
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
+        handler = logging.StreamHandler(stream or sys.stdout)
         handler.setLevel(numeric_level)
 
         formatter = logging.Formatter(
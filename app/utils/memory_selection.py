@@ -0,0 +1,101 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+from app.utils.tokens import count_tokens
+
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "with", "is", "are", "was",
+    "be", "has", "have", "i", "im", "my", "me", "user", "users", "s", "am", "as", "by", "from",
+})
+
+
+@dataclass
+class MemorySelectionStats:
+    retrieved: int = 0
+    low_score: int = 0
+    duplicate: int = 0
+    in_history: int = 0
+    over_budget: int = 0
+    kept: int = 0
+    tokens: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"retrieved={self.retrieved} low_score={self.low_score} duplicate={self.duplicate} "
+            f"in_history={self.in_history} over_budget={self.over_budget} kept={self.kept} tokens={self.tokens}"
+        )
+
+
+def _terms(text: str) -> FrozenSet[str]:
+    """Content words of ``text``, lower-cased with a crude plural/verb ``s`` stripped."""
+    terms = set()
+    for word in _WORD_RE.findall(text.casefold()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        terms.add(word)
+    return frozenset(terms)
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _containment(memory: FrozenSet[str], text: FrozenSet[str]) -> float:
+    # A memory without any terms is never considered already covered by the history
+    if not memory:
+        return 0.0
+    return len(memory & text) / len(memory)
+
+
+def select_memories(
+    results: List[Dict[str, Any]],
+    history_texts: Iterable[str],
+    score_threshold: float,
+    duplicate_similarity: float,
+    max_tokens: int
+) -> Tuple[List[Dict[str, Any]], MemorySelectionStats]:
+    """Pick the memories worth putting into the prompt.
+
+    Memories are taken in score order. A memory is dropped when its score is below
+    ``score_threshold``, when its terms overlap an already kept memory by at least
+    ``duplicate_similarity`` (Jaccard), when that share of its terms already appears in
+    one of ``history_texts``, or when it would exceed the ``max_tokens`` budget.
+
+    Returns:
+        The kept memories and the selection statistics
+    """
+    stats = MemorySelectionStats(retrieved=len(results))
+    history_terms = [_terms(text) for text in history_texts]
+
+    kept: List[Dict[str, Any]] = []
+    kept_terms: List[FrozenSet[str]] = []
+    for memory in sorted(results, key=lambda item: item.get("score") or 0.0, reverse=True):
+        if (memory.get("score") or 0.0) < score_threshold:
+            stats.low_score += 1
+            continue
+
+        terms = _terms(memory["memory"])
+        if any(_jaccard(terms, other) >= duplicate_similarity for other in kept_terms):
+            stats.duplicate += 1
+            continue
+        if any(_containment(terms, text) >= duplicate_similarity for text in history_terms):
+            stats.in_history += 1
+            continue
+
+        tokens = count_tokens(memory["memory"]) + 3
+        if stats.tokens + tokens > max_tokens:
+            stats.over_budget += 1
+            continue
+
+        stats.tokens += tokens
+        kept.append(memory)
+        kept_terms.append(terms)
+
+    stats.kept = len(kept)
+    return kept, stats
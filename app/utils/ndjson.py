@@ -0,0 +1,41 @@
+import zlib
+from typing import Any, Dict, Iterable, Iterator
+
+# Compact UTF-8 JSON, shared by the NDJSON export and the completion stream encoder.
+try:
+    import orjson
+
+    def dumps(value) -> bytes:
+        return orjson.dumps(value)
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    import json
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Bytes buffered before a chunk is yielded, so a response is a few large writes, not one per line.
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], compress: bool = False) -> Iterator[bytes]:
+    """Encode ``records`` as newline-delimited JSON chunks, optionally as one gzip stream.
+
+    Records are consumed lazily and at most ``CHUNK_SIZE`` bytes are held at a time,
+    so memory stays constant however many records there are.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    for record in records:
+        buffer += dumps(record)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -1,31 +1,126 @@
+import asyncio
 import time
 import uuid
 
-from typing import Dict, Any, Optional
-
-
-async def create_streaming_openai_chunk(
-        content: Optional[str] = None,
-        role: Optional[str] = None,
-        finish_reason: Optional[str] = None,
-) -> Dict[str, Any]:
-    chunk = {
-        "id": f"chatcmpl-{uuid.uuid4().hex}",
-        "object": "chat.completion.chunk",
-        "created": int(time.time()),
-        "choices": [
-            {
-                "index": 0,
-                "delta": {},
-                "finish_reason": finish_reason
-            }
-        ]
-    }
-
-    if content:
-        chunk["choices"][0]["delta"]["content"] = content
-
-    if role:
-        chunk["choices"][0]["delta"]["role"] = role
-
-    return chunk
\ No newline at end of file
+from typing import AsyncGenerator, AsyncIterable, Optional
+
+from app.utils.ndjson import dumps
+
+
+class CompletionChunkEncoder:
+    """Encodes OpenAI ``chat.completion.chunk`` events as server-sent event bytes.
+
+    The completion id, timestamp and JSON envelope are fixed once per response,
+    so encoding a content chunk only serializes the content string itself and
+    concatenates it with pre-encoded bytes.
+    """
+
+    def __init__(self, completion_id: Optional[str] = None, created: Optional[int] = None):
+        self.completion_id = completion_id or f"chatcmpl-{uuid.uuid4().hex}"
+        self.created = created or int(time.time())
+
+        envelope = dumps({
+            "id": self.completion_id,
+            "object": "chat.completion.chunk",
+            "created": self.created,
+        })
+        # '{"id":...,"created":...' without the closing brace
+        head = b"data: " + envelope[:-1] + b',"choices":[{"index":0,"delta":'
+        self._content_prefix = head + b'{"content":'
+        self._content_suffix = b'},"finish_reason":null}]}\n\n'
+        self._head = head
+
+    def role(self, role: str = "assistant") -> bytes:
+        return self._head + b'{"role":' + dumps(role) + self._content_suffix
+
+    def content(self, content: str) -> bytes:
+        return self._content_prefix + dumps(content) + self._content_suffix
+
+    def finish(self, finish_reason: str = "stop") -> bytes:
+        return self._head + b'{},"finish_reason":' + dumps(finish_reason) + b"}]}\n\n"
+
+    @staticmethod
+    def done() -> bytes:
+        return b"data: [DONE]\n\n"
+
+
+async def iter_words(text: str) -> AsyncGenerator[str, None]:
+    """Yield ``text`` word by word, keeping the whitespace so the pieces join back losslessly."""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find(" ", start + 1)
+        if end == -1:
+            end = length
+        yield text[start:end]
+        start = end
+
+
+class _StreamError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END_OF_STREAM = object()
+
+
+async def coalesce(
+    tokens: AsyncIterable[str],
+    max_chars: int,
+    max_delay: float,
+) -> AsyncGenerator[str, None]:
+    """Group a token stream into larger chunks.
+
+    A chunk is emitted when it reaches ``max_chars`` characters or when its first
+    token has been buffered for ``max_delay`` seconds, whichever comes first, so
+    fast streams produce few large events and slow streams still flush promptly.
+    Tokens are pumped into a queue by a background task; the consumer only sets
+    up a timed wait when the queue runs dry.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for token in tokens:
+                queue.put_nowait(token)
+        except Exception as e:
+            queue.put_nowait(_StreamError(e))
+        queue.put_nowait(_END_OF_STREAM)
+
+    producer = asyncio.ensure_future(pump())
+    buffer = []
+    size = 0
+    deadline = 0.0
+    try:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                if not buffer:
+                    item = await queue.get()
+                else:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        yield "".join(buffer)
+                        buffer, size = [], 0
+                        continue
+
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, _StreamError):
+                raise item.error
+
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(item)
+            size += len(item)
+            if size >= max_chars or loop.time() >= deadline:
+                yield "".join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        producer.cancel()
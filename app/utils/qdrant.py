@@ -1,4 +1,347 @@
-from typing import List, Dict, Any
+import os
+import re
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient, models
+
+logger = setup_logger(__name__)
+
+# Payload fields returned by history reads; the vectors and anything else stay on the server.
+HISTORY_PAYLOAD_FIELDS = ["user_message", "assistant_message", "timestamp", "metadata"]
+
+LEGACY_ASSISTANT_MARKER = "\nAssistant:"
+
+# Rolling chat summaries share the chat-history collection under this record type.
+SUMMARY_RECORD_TYPE = "chat_summary"
+# One record per chat with its latest turn, maintained on write for the chat list.
+SESSION_RECORD_TYPE = "chat_session"
+# Records that are not conversation turns; turn queries exclude them.
+AUXILIARY_RECORD_TYPES = [SUMMARY_RECORD_TYPE, SESSION_RECORD_TYPE]
+
+SESSION_PREVIEW_CHARS = 200
+
+# Facet queries return at most this many distinct values.
+MAX_FACET_VALUES = 100_000
+
+
+_client: Optional["QdrantClient"] = None
+_client_pid: Optional[int] = None
+
+
+def get_qdrant_client() -> "QdrantClient":
+    """Qdrant client shared by every component of this process, over gRPC when QDRANT_PREFER_GRPC is set."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        from qdrant_client import QdrantClient
+
+        _client = QdrantClient(
+            settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC
+        )
+        _client_pid = os.getpid()
+    return _client
+
+
+def versioned_collection_name(base: str, model: Optional[str] = None, dims: Optional[int] = None) -> str:
+    """Physical collection name for an embedding model and size, e.g. ``chats__text-embedding-3-small_768``."""
+    model = model or settings.EMBEDDING_MODEL
+    dims = dims or settings.EMBEDDING_DIMS
+    return f"{base}__{re.sub(r'[^a-z0-9]+', '-', model.lower()).strip('-')}_{dims}"
+
+
+def alias_target(client: "QdrantClient", alias: str) -> Optional[str]:
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def resolve_collection_name(client: "QdrantClient", base: str) -> str:
+    """Collection the service reads and writes for the logical name ``base``.
+
+    ``base`` is an alias to a versioned collection; a plain collection with that
+    name (created before versioning) keeps being used until it is migrated. When
+    neither exists, the versioned name for the configured embedding model is used.
+    """
+    target = alias_target(client, base)
+    if target:
+        return target
+    if client.collection_exists(base):
+        return base
+    return versioned_collection_name(base)
+
+
+def ensure_collection_alias(client: "QdrantClient", base: str, collection_name: str) -> None:
+    """Point the alias ``base`` at ``collection_name`` unless ``base`` is already taken."""
+    from qdrant_client import models
+
+    if collection_name == base or alias_target(client, base) or client.collection_exists(base):
+        return
+    try:
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                models.CreateAliasOperation(
+                    create_alias=models.CreateAlias(collection_name=collection_name, alias_name=base)
+                )
+            ]
+        )
+    except Exception:
+        # Another worker may have created it concurrently.
+        if not alias_target(client, base):
+            raise
+
+
+def tenant_collection_name(base: str, tenant_id: str) -> str:
+    """Name of a tenant's dedicated collection (or alias) under ``base``, e.g. ``chats__tenant_acme-05c4ba3e``."""
+    slug = re.sub(r"[^a-z0-9]+", "-", tenant_id.lower()).strip("-")[:48]
+    return f"{base}__tenant_{slug}-{zlib.crc32(tenant_id.encode()):08x}"
+
+
+def dedicated_tenant_collections(client: "QdrantClient", base: str) -> Dict[str, str]:
+    """Aliases of the tenants moved out of ``base`` into their own collection, and their collections."""
+    prefix = f"{base}__tenant_"
+    return {
+        description.alias_name: description.collection_name
+        for description in client.get_aliases().aliases
+        if description.alias_name.startswith(prefix)
+    }
+
+
+def tenant_history_collection(client: "QdrantClient", base: str, tenant_id: str) -> str:
+    """Collection holding a tenant's history: its dedicated collection if it has one, else the one behind ``base``."""
+    routes = dedicated_tenant_collections(client, base)
+    return routes.get(tenant_collection_name(base, tenant_id)) or resolve_collection_name(client, base)
+
+
+def facet_counts(
+    client: "QdrantClient",
+    collection_name: str,
+    key: str,
+    facet_filter: Optional["models.Filter"] = None
+) -> Dict[str, int]:
+    """Exact number of points per distinct value of ``key`` among the points matching ``facet_filter``."""
+    response = client.facet(
+        collection_name=collection_name,
+        key=key,
+        facet_filter=facet_filter,
+        limit=MAX_FACET_VALUES,
+        exact=True
+    )
+    return {hit.value: hit.count for hit in response.hits}
+
+
+def check_vector_size(client: "QdrantClient", collection_name: str, dims: int) -> None:
+    """Fail fast when a collection holds vectors of another size than the embedding model produces."""
+    vectors = client.get_collection(collection_name).config.params.vectors
+    size = vectors.size if hasattr(vectors, "size") else vectors[""].size
+    if size != dims:
+        raise RuntimeError(
+            f"Collection {collection_name} stores {size}-d vectors but EMBEDDING_DIMS is {dims}; "
+            f"re-embed it with python -m app.tools.reembed_collection first"
+        )
+
+
+def dense_vector_params(size: int) -> "models.VectorParams":
+    """Dense vector config of a collection: cosine distance, on disk per QDRANT_VECTORS_ON_DISK."""
+    from qdrant_client import models
+
+    return models.VectorParams(
+        size=size,
+        distance=models.Distance.COSINE,
+        on_disk=settings.QDRANT_VECTORS_ON_DISK
+    )
+
+
+def quantization_config() -> Optional["models.QuantizationConfig"]:
+    """Quantization configured by QDRANT_QUANTIZATION, kept in RAM next to on-disk originals."""
+    from qdrant_client import models
+
+    if settings.QDRANT_QUANTIZATION == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    if settings.QDRANT_QUANTIZATION == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def hnsw_config() -> "models.HnswConfigDiff":
+    from qdrant_client import models
+
+    return models.HnswConfigDiff(m=settings.QDRANT_HNSW_M, ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT)
+
+
+def search_params() -> "models.SearchParams":
+    """Search params: HNSW ef and rescoring of quantized candidates with the original vectors."""
+    from qdrant_client import models
+
+    quantization = None
+    if settings.QDRANT_QUANTIZATION != "none":
+        quantization = models.QuantizationSearchParams(
+            rescore=True,
+            oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING
+        )
+    return models.SearchParams(hnsw_ef=settings.QDRANT_HNSW_EF, quantization=quantization)
+
+
+def sync_collection_storage(client: "QdrantClient", collection_name: str, apply: bool = True) -> None:
+    """Bring an existing collection's storage options in line with the settings.
+
+    Only the options that differ are updated, since every change makes Qdrant
+    rebuild the affected segments in the background. Used for collections created
+    by other code (mem0) or by an older version of this service. With ``apply``
+    off, the differences are only logged.
+    """
+    from qdrant_client import models
+
+    config = client.get_collection(collection_name).config
+    vectors = config.params.vectors
+    changes: Dict[str, Any] = {}
+
+    if isinstance(vectors, models.VectorParams) and bool(vectors.on_disk) != settings.QDRANT_VECTORS_ON_DISK:
+        changes["vectors_config"] = {"": models.VectorParamsDiff(on_disk=settings.QDRANT_VECTORS_ON_DISK)}
+    if bool(config.params.on_disk_payload) != settings.QDRANT_ON_DISK_PAYLOAD:
+        changes["collection_params"] = models.CollectionParamsDiff(on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD)
+    if (config.hnsw_config.m, config.hnsw_config.ef_construct) != (
+        settings.QDRANT_HNSW_M, settings.QDRANT_HNSW_EF_CONSTRUCT
+    ):
+        changes["hnsw_config"] = hnsw_config()
+
+    current = config.quantization_config
+    current_kind = (
+        "scalar" if isinstance(current, models.ScalarQuantization)
+        else "binary" if isinstance(current, models.BinaryQuantization)
+        else "none"
+    )
+    if current_kind != settings.QDRANT_QUANTIZATION:
+        changes["quantization_config"] = quantization_config() or models.Disabled.DISABLED
+
+    if not changes:
+        return
+    if not apply:
+        logger.warning(
+            f"Storage options of {collection_name} differ from the settings: {', '.join(changes)}; "
+            "set QDRANT_SYNC_STORAGE_ON_START=true to update them"
+        )
+        return
+    logger.info(f"Updating storage options of {collection_name}: {', '.join(changes)}")
+    client.update_collection(collection_name=collection_name, **changes)
+
+
+def summary_point_id(chat_id: str, tenant_id: str, user_id: str) -> str:
+    """Deterministic point id of a chat's summary record."""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"chat-summary/{tenant_id}/{user_id}/{chat_id}").hex
+
+
+def session_point_id(chat_id: str, tenant_id: str, user_id: str) -> str:
+    """Deterministic point id of a chat's session record."""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"chat-session/{tenant_id}/{user_id}/{chat_id}").hex
+
+
+def exclude_auxiliary_records() -> "models.FieldCondition":
+    """``must_not`` condition that leaves only conversation turns."""
+    from qdrant_client import models
+
+    return models.FieldCondition(key="record_type", match=models.MatchAny(any=AUXILIARY_RECORD_TYPES))
+
+
+def format_turn_text(question: str, answer: str) -> str:
+    """Text that is embedded for a conversation turn."""
+    return f"User: {question}\nAssistant: {answer}"
+
+
+def build_turn_payload(
+    question: str,
+    answer: str,
+    metadata: Dict[str, Any],
+    timestamp: Optional[float] = None
+) -> Dict[str, Any]:
+    """Build the structured payload of a conversation turn.
+
+    Args:
+        question: The user's message
+        answer: The assistant's reply
+        metadata: Filter fields (``tenant_id``, ``user_id``, ``chat_id``)
+        timestamp: Epoch seconds of the turn, defaults to now
+
+    Returns:
+        Qdrant point payload
+    """
+    return {
+        "user_message": question,
+        "assistant_message": answer,
+        "timestamp": time.time() if timestamp is None else timestamp,
+        "metadata": {key: value for key, value in metadata.items() if key != "timestamp"},
+    }
+
+
+def build_session_payload(turn_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Session record payload of a chat from the payload of its latest turn."""
+    return {
+        "record_type": SESSION_RECORD_TYPE,
+        "last_user_message": turn_payload["user_message"][:SESSION_PREVIEW_CHARS],
+        "last_assistant_message": turn_payload["assistant_message"][:SESSION_PREVIEW_CHARS],
+        "last_timestamp": turn_payload["timestamp"],
+        "metadata": turn_payload["metadata"],
+    }
+
+
+def format_session_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Chat list entry from a session record payload or a turn payload."""
+    if payload.get("record_type") != SESSION_RECORD_TYPE:
+        payload = build_session_payload(payload)
+    return {
+        "chat_id": payload["metadata"].get("chat_id", ""),
+        "last_user_message": payload["last_user_message"],
+        "last_assistant_message": payload["last_assistant_message"],
+        "last_timestamp": format_timestamp(payload["last_timestamp"]),
+        "updated_at": payload["last_timestamp"],
+    }
+
+
+def parse_legacy_turn(payload: Dict[str, Any]) -> Tuple[str, str, Optional[float]]:
+    """Recover (user_message, assistant_message, epoch timestamp) from a ``page_content`` payload.
+
+    Legacy points were written as ``"User: <question>\\nAssistant: <answer>"``; only the
+    first marker separates the two sides, so answers containing "Assistant:" survive.
+    """
+    content = payload.get("page_content", "")
+    metadata = payload.get("metadata") or {}
+
+    user_msg, separator, assistant_msg = content.partition(LEGACY_ASSISTANT_MARKER)
+    if not separator:
+        user_msg, assistant_msg = content, ""
+    if user_msg.startswith("User:"):
+        user_msg = user_msg[len("User:"):]
+
+    timestamp = None
+    if metadata.get("timestamp"):
+        try:
+            timestamp = datetime.fromisoformat(metadata["timestamp"]).timestamp()
+        except ValueError:
+            timestamp = None
+
+    return user_msg.strip(), assistant_msg.strip(), timestamp
+
+
+def format_timestamp(timestamp: Any) -> str:
+    if isinstance(timestamp, (int, float)):
+        return str(datetime.fromtimestamp(timestamp))
+    return timestamp or ""
 
 
 def format_chat_results(points) -> List[Dict[str, Any]]:
@@ -13,25 +356,80 @@ def format_chat_results(points) -> List[Dict[str, Any]]:
     results = []
     for point in points:
         payload = point.payload
-        content = payload.get("page_content", "")
-        metadata = payload.get("metadata", "")
-
-        user_msg = ""
-        assistant_msg = ""
-        if "User:" in content and "Assistant:" in content:
-            parts = content.split("Assistant:")
-            user_part = parts[0].strip()
-            assistant_msg = parts[1].strip() if len(parts) > 1 else ""
-            user_msg = user_part.replace("User:", "").strip()
+        metadata = payload.get("metadata") or {}
 
         chat_msg = {
             "id": str(point.id),
-            "user_message": user_msg,
-            "assistant_message": assistant_msg,
-            "timestamp": metadata.get("timestamp", ""),
+            "user_message": payload.get("user_message", ""),
+            "assistant_message": payload.get("assistant_message", ""),
+            "timestamp": format_timestamp(payload.get("timestamp")),
+            "created_at": payload.get("timestamp"),
             "chat_id": metadata.get("chat_id", ""),
             "user_id": metadata.get("user_id", "")
         }
         results.append(chat_msg)
 
-    return results
\ No newline at end of file
+    return results
+
+
+def iter_history_records(
+    client: "QdrantClient",
+    collection_name: str,
+    tenant_id: str,
+    user_id: Optional[str] = None,
+    batch_size: int = 256
+) -> Iterator[Dict[str, Any]]:
+    """Stream every conversation turn of a tenant (or one of its users) as export records.
+
+    Walks the collection with scroll cursors one page at a time, in point id order,
+    so only ``batch_size`` points are held in memory. Nothing is written.
+    """
+    from qdrant_client import models
+
+    conditions = [
+        models.FieldCondition(
+            key="metadata.tenant_id",
+            match=models.MatchValue(value=tenant_id)
+        )
+    ]
+    if user_id is not None:
+        conditions.append(
+            models.FieldCondition(
+                key="metadata.user_id",
+                match=models.MatchValue(value=str(user_id))
+            )
+        )
+    history_filter = models.Filter(
+        must=conditions,
+        must_not=[exclude_auxiliary_records()]
+    )
+
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=history_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=HISTORY_PAYLOAD_FIELDS,
+            with_vectors=False
+        )
+        for point in points:
+            yield format_export_record(point)
+        if offset is None:
+            return
+
+
+def format_export_record(point) -> Dict[str, Any]:
+    """Flat export record of a conversation turn point."""
+    payload = point.payload
+    metadata = payload.get("metadata") or {}
+    return {
+        "id": str(point.id),
+        "tenant_id": metadata.get("tenant_id", ""),
+        "user_id": metadata.get("user_id", ""),
+        "chat_id": metadata.get("chat_id", ""),
+        "user_message": payload.get("user_message", ""),
+        "assistant_message": payload.get("assistant_message", ""),
+        "timestamp": payload.get("timestamp"),
+    }
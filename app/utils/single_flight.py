@@ -0,0 +1,44 @@
+import asyncio
+import hashlib
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.core.metrics import SINGLE_FLIGHT_CALLS
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a user message for de-duplication (case and whitespace insensitive)."""
+    return _WHITESPACE_RE.sub(" ", question).strip().casefold()
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the computation as a task; callers that
+    arrive while it is running await the same task and get the same result (or
+    exception). The task is shielded, so a caller that disconnects doesn't
+    cancel the work for the others, and the work always runs to completion.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            SINGLE_FLIGHT_CALLS.labels(name=self.name, result="leader").inc()
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            SINGLE_FLIGHT_CALLS.labels(name=self.name, result="shared").inc()
+            # The key may hold user content (the question), so only a digest of it is logged
+            digest = hashlib.sha256(repr(key).encode()).hexdigest()[:12]
+            logger.info(f"Attaching to in-flight {self.name} call {digest}")
+        return await asyncio.shield(task)
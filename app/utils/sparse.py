@@ -0,0 +1,48 @@
+import re
+import zlib
+from collections import Counter
+from typing import List, Tuple
+
+# Name of the sparse (keyword) vector stored next to the dense embedding of a chat turn.
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 term-frequency saturation; IDF is applied by Qdrant (Modifier.IDF) at query time.
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_AVG_DOC_LENGTH = 64
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its me my of on or that the "
+    "this to was we were what when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def _term_index(term: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(term.encode("utf-8")) & 0x7FFFFFFF
+
+
+def _to_sparse(weights: Counter) -> Tuple[List[int], List[float]]:
+    merged = Counter()
+    for term, weight in weights.items():
+        merged[_term_index(term)] += weight
+    indices = sorted(merged)
+    return indices, [float(merged[index]) for index in indices]
+
+
+def encode_document(text: str) -> Tuple[List[int], List[float]]:
+    """Sparse BM25 document vector of ``text`` as (indices, values)."""
+    terms = Counter(tokenize(text))
+    length = sum(terms.values())
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / BM25_AVG_DOC_LENGTH)
+    return _to_sparse(Counter({term: tf * (BM25_K1 + 1) / (tf + norm) for term, tf in terms.items()}))
+
+
+def encode_query(text: str) -> Tuple[List[int], List[float]]:
+    """Sparse BM25 query vector of ``text``: every distinct term weighs 1."""
+    return _to_sparse(Counter(dict.fromkeys(tokenize(text), 1.0)))
@@ -0,0 +1,21 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken missing or its encoding file can't be fetched; fall back to estimation.
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens, approximating ~4 characters per token without tiktoken."""
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
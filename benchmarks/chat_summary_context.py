@@ -0,0 +1,105 @@
+"""
+Benchmark of prompt context size and build latency against chat length.
+
+"Before" is the previous context builder: the chat's turns read from Qdrant
+(capped at 100) and sent verbatim. "After" is the rolling summary plus the
+turns it doesn't cover yet, with the summary maintained by
+ConversationSummarizer as turns are written. Runs against an in-memory Qdrant
+with fake embeddings and a fake summarizer LLM, so only the context side is
+measured; LLM latency grows with the prompt tokens reported here.
+
+Usage:
+    python -m benchmarks.chat_summary_context [--lengths 10 25 50 100 200] [--runs 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import tiktoken
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from qdrant_client import QdrantClient
+
+from app.agent.chat_agent import build_context
+from app.core.config import settings
+from app.services.summarizer import ConversationSummarizer
+from app.services.vector_store import MultiTenantVectorStore
+
+TENANT_ID = "bench-tenant"
+USER_ID = "1"
+
+QUESTION = "Can you explain how the deployment pipeline handles database migrations for tenant {i}?"
+ANSWER = (
+    "Sure. In step {i} the pipeline first builds the container image, runs the unit tests and then "
+    "applies the Alembic migrations against a staging copy of the database. If they succeed, the "
+    "migrations are applied to production inside a transaction, and the new image is rolled out "
+    "gradually while health checks watch error rates and latency. "
+) * 2
+SUMMARY = " ".join(["The user is building a multi-tenant deployment pipeline and asked about migrations."] * 20)
+
+
+def token_counter():
+    """tiktoken's o200k encoding when it can be loaded, otherwise ~4 characters per token."""
+    try:
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "approx", lambda text: len(text) // 4
+
+
+def median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    counter_name, count_tokens = token_counter()
+    store = MultiTenantVectorStore(
+        collection_name="bench_chat_history",
+        embedding=FakeEmbeddings(size=settings.EMBEDDING_DIMS),
+        client=QdrantClient(":memory:")
+    )
+    summarizer = ConversationSummarizer(store, llm=FakeListChatModel(responses=[SUMMARY]))
+
+    print(f"prompt tokens counted with {counter_name}")
+    print(f"{'turns':>6} {'before tok':>11} {'after tok':>10} {'before ms':>10} {'after ms':>9}")
+    for length in args.lengths:
+        chat_id = f"chat-{length}"
+        for i in range(length):
+            store.store_conversation(
+                QUESTION.format(i=i), ANSWER.format(i=i), TENANT_ID, {"user_id": USER_ID, "chat_id": chat_id}
+            )
+            await summarizer.update_summary(chat_id, TENANT_ID, USER_ID)
+
+        def before() -> str:
+            turns = store.get_chat_by_id(chat_id=chat_id, tenant_id=TENANT_ID, user_id=USER_ID)
+            return build_context([], None, turns)
+
+        def after() -> str:
+            summary = store.get_chat_summary(chat_id=chat_id, tenant_id=TENANT_ID, user_id=USER_ID)
+            turns = store.get_chat_turns_since(
+                chat_id=chat_id,
+                tenant_id=TENANT_ID,
+                user_id=USER_ID,
+                since=summary["summarized_until"] if summary else None
+            )
+            return build_context([], summary["summary"] if summary else None, turns)
+
+        print(
+            f"{length:>6} {count_tokens(before()):>11} {count_tokens(after()):>10} "
+            f"{median_ms(before, args.runs):>10.2f} {median_ms(after, args.runs):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Startup benchmark for the HTTP API based on ``python -X importtime``.
+
+Imports ``app.main`` in a fresh interpreter, reports the cumulative import time
+and the slowest top-level packages, and fails when the budget is exceeded or
+when a module that only the voice worker or first request needs is imported.
+
+Usage:
+    python -m benchmarks.import_time [--budget-ms 2500] [--runs 3]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_BUDGET_MS = 2500
+
+# Loaded lazily on first use, never while importing the API.
+FORBIDDEN_MODULES = (
+    "mem0",
+    "langchain_openai",
+    "langchain_qdrant",
+    "qdrant_client",
+    "torch",
+    "livekit",
+)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_importtime(target: str) -> List[Tuple[int, int, str]]:
+    """Import ``target`` in a subprocess and return (self_us, cumulative_us, module) rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), match.group(4)))
+    return rows
+
+
+def top_level_packages(rows: List[Tuple[int, int, str]]) -> Dict[str, int]:
+    """Sum self time per top-level package."""
+    totals: Dict[str, int] = {}
+    for self_us, _, module in rows:
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    # The first run also pays for bytecode compilation, so it is discarded.
+    run_importtime(args.target)
+
+    timings = []
+    rows: List[Tuple[int, int, str]] = []
+    for _ in range(args.runs):
+        rows = run_importtime(args.target)
+        total_us = next(cumulative for _, cumulative, module in rows if module == args.target)
+        timings.append(total_us / 1000)
+
+    best_ms = min(timings)
+    print(f"import {args.target}: best {best_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms} ms)")
+
+    print("Slowest packages (self time):")
+    packages = sorted(top_level_packages(rows).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:args.top]:
+        print(f"  {package:<30} {self_us / 1000:8.1f} ms")
+
+    imported = {module for _, _, module in rows}
+    leaked = sorted(
+        module for module in imported
+        if module.split(".")[0] in FORBIDDEN_MODULES
+    )
+
+    failed = False
+    if leaked:
+        print(f"FAIL: eagerly imported {', '.join(sorted({m.split('.')[0] for m in leaked}))}")
+        failed = True
+    if best_ms > args.budget_ms:
+        print(f"FAIL: {best_ms:.0f} ms exceeds budget of {args.budget_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
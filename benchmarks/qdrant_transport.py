@@ -0,0 +1,118 @@
+"""
+Benchmark of the REST and gRPC transports of the Qdrant client.
+
+Creates a scratch collection shaped like the chat history (768-d vectors,
+turn payloads with a few hundred characters of text) on the Qdrant server at
+QDRANT_HOST, then measures with each transport:
+
+* upsert: points/s written in batches of ``--batch`` (``wait=True``),
+* scroll: points/s read back with payloads in pages of ``--page``, as the
+  history export and the maintenance tools do,
+* scroll-light: the same without vectors, like the history endpoints.
+
+Both transports hit the same server and collection, so the difference is the
+encoding (JSON vs protobuf) and HTTP/1.1 vs HTTP/2. The collection is deleted
+afterwards.
+
+Usage:
+    python -m benchmarks.qdrant_transport [--points 20000] [--batch 256] [--page 256] [--rounds 3]
+"""
+import argparse
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.core.config import settings
+
+COLLECTION = f"bench_transport_{uuid.uuid4().hex[:8]}"
+
+
+def make_points(count: int, dims: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dims)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        models.PointStruct(
+            id=uuid.uuid4().hex,
+            vector=vector.tolist(),
+            payload={
+                "user_message": f"Question {i} " + "lorem ipsum " * 20,
+                "assistant_message": f"Answer {i} " + "dolor sit amet " * 30,
+                "timestamp": time.time(),
+                "metadata": {"tenant_id": "bench", "user_id": str(i % 50), "chat_id": f"chat-{i % 500}"},
+            },
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def upsert(client: QdrantClient, points: list, batch: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(points), batch):
+        client.upsert(collection_name=COLLECTION, points=points[start:start + batch], wait=True)
+    return len(points) / (time.perf_counter() - started)
+
+
+def scroll(client: QdrantClient, page: int, with_vectors: bool) -> float:
+    started = time.perf_counter()
+    read = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=COLLECTION,
+            limit=page,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors
+        )
+        read += len(records)
+        if offset is None:
+            return read / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--page", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=3, help="Best of N per measurement")
+    args = parser.parse_args()
+
+    clients = {
+        "rest": QdrantClient(settings.QDRANT_HOST, port=settings.QDRANT_PORT),
+        "grpc": QdrantClient(
+            settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            prefer_grpc=True
+        ),
+    }
+    points = make_points(args.points, args.dims, seed=0)
+    admin = clients["rest"]
+    admin.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=args.dims, distance=models.Distance.COSINE)
+    )
+    try:
+        results = {}
+        for name, client in clients.items():
+            results[name] = {
+                "upsert": max(upsert(client, points, args.batch) for _ in range(args.rounds)),
+                "scroll": max(scroll(client, args.page, with_vectors=True) for _ in range(args.rounds)),
+                "scroll-light": max(scroll(client, args.page, with_vectors=False) for _ in range(args.rounds)),
+            }
+    finally:
+        admin.delete_collection(COLLECTION)
+
+    print(f"{args.points} points, {args.dims}-d, batch {args.batch}, page {args.page} (points/s, best of {args.rounds})")
+    print(f"{'operation':<13} {'rest':>10} {'grpc':>10} {'speedup':>8}")
+    for operation in results["rest"]:
+        rest, grpc = results["rest"][operation], results["grpc"][operation]
+        print(f"{operation:<13} {rest:>10.0f} {grpc:>10.0f} {grpc / rest:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark for the SSE encoding of chat completion chunks.
+
+Compares the previous per-chunk path (async dict builder with a fresh uuid4 and
+time.time() per chunk, stdlib json.dumps, fixed 10-character cuts) against
+CompletionChunkEncoder, first with the same 10-character cuts (per-chunk
+encoding cost) and then with size/time coalescing (per-response cost).
+Reports encoded chunks/sec and payload bytes/sec on a single core.
+
+Usage:
+    python -m benchmarks.sse_encoder [--answer-chars 2000] [--responses 500]
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from app.utils.openai_mapper import CompletionChunkEncoder, coalesce, iter_words
+
+SAMPLE = (
+    "FastAPI is a modern, fast web framework for building APIs with Python based on standard "
+    "type hints. It supports \"async\" endpoints, dependency injection and automatic docs. "
+)
+
+
+async def legacy_chunk(content=None, role=None, finish_reason=None):
+    chunk = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+    }
+    if content:
+        chunk["choices"][0]["delta"]["content"] = content
+    if role:
+        chunk["choices"][0]["delta"]["role"] = role
+    return chunk
+
+
+async def legacy_response(answer: str):
+    yield f"data: {json.dumps(await legacy_chunk(role='assistant'))}\n\n"
+    for i in range(0, len(answer), 10):
+        yield f"data: {json.dumps(await legacy_chunk(content=answer[i:i + 10]))}\n\n"
+    yield f"data: {json.dumps(await legacy_chunk(finish_reason='stop'))}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+async def encoder_fixed_response(answer: str):
+    encoder = CompletionChunkEncoder()
+    yield encoder.role()
+    for i in range(0, len(answer), 10):
+        yield encoder.content(answer[i:i + 10])
+    yield encoder.finish("stop")
+    yield encoder.done()
+
+
+async def encoder_response(answer: str, max_chars: int, max_delay: float):
+    encoder = CompletionChunkEncoder()
+    yield encoder.role()
+    async for piece in coalesce(iter_words(answer), max_chars=max_chars, max_delay=max_delay):
+        yield encoder.content(piece)
+    yield encoder.finish("stop")
+    yield encoder.done()
+
+
+async def measure(name: str, make_stream, responses: int) -> None:
+    chunks = 0
+    size = 0
+    started = time.perf_counter()
+    for _ in range(responses):
+        async for event in make_stream():
+            chunks += 1
+            size += len(event)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<28} {chunks / elapsed:>12,.0f} chunks/s {size / elapsed / 1e6:>8.1f} MB/s "
+        f"{responses / elapsed:>9,.0f} responses/s {chunks / responses:>6.0f} chunks/response"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answer-chars", type=int, default=2000)
+    parser.add_argument("--responses", type=int, default=500)
+    parser.add_argument("--max-chars", type=int, default=64)
+    parser.add_argument("--max-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    answer = (SAMPLE * (args.answer_chars // len(SAMPLE) + 1))[:args.answer_chars]
+    await measure("legacy (10-char, json)", lambda: legacy_response(answer), args.responses)
+    await measure("encoder (10-char)", lambda: encoder_fixed_response(answer), args.responses)
+    await measure(
+        f"encoder ({args.max_chars}-char window)",
+        lambda: encoder_response(answer, args.max_chars, args.max_delay),
+        args.responses,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Throughput benchmark for the multi-worker deployment mode.
+
+Starts gunicorn with an increasing number of workers and drives
+``POST /api/v1/auth/login`` with concurrent clients. Login is CPU-bound
+(bcrypt) and needs only the SQL database, which makes it a good probe for
+how well the API uses additional cores.
+
+The MCP servers must be running because every worker builds the LangGraph
+graph at startup (see README).
+
+Usage:
+    python -m benchmarks.worker_scaling --workers 1 2 4 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:{port}/api/v1"
+
+
+async def wait_until_ready(client: httpx.AsyncClient, base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(f"{base_url}/openapi.json")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not become ready")
+
+
+async def drive(base_url: str, total: int, concurrency: int) -> float:
+    """Register a user, then run ``total`` logins and return requests/sec."""
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    credentials = {"username": username, "password": "bench-password"}
+    async with httpx.AsyncClient(timeout=60) as client:
+        await wait_until_ready(client, base_url)
+        await client.post(f"{base_url}/auth/register", json={**credentials, "tenant_id": "bench"})
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post(f"{base_url}/auth/login", data=credentials)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(total)))
+        return total / (time.perf_counter() - started)
+
+
+def run(workers: int, port: int, total: int, concurrency: int) -> float:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return asyncio.run(drive(BASE_URL.format(port=port), total, concurrency))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'efficiency':>10}")
+    for workers in args.workers:
+        throughput = run(workers, args.port, args.requests, args.concurrency)
+        baseline = baseline or throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>7} {throughput:>9.1f} {speedup:>7.2f}x {speedup / workers:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for the multi-worker deployment mode.
+
+Usage:
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Every worker runs the FastAPI lifespan on its own, so the LangGraph graph, MCP
+sessions, Qdrant clients and DB pool are created per process. Set
+GRAPH_CHECKPOINTER to "postgres" (shared) or "none" (stateless) when
+WEB_CONCURRENCY > 1.
+"""
+import os
+
+from app.core.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+# Importing the app in the master would create clients that forked workers then share.
+preload_app = False
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    from app.agent import langgraph_agent
+
+    langgraph_agent.reset_process_state()
+    server.log.info(f"Worker {worker.pid} forked, per-process state reset")
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,170 @@
+"""Voice worker job lifecycle without LiveKit Cloud.
+
+The LiveKit SDK and its plugins are replaced by in-process fakes, so the worker's
+``prewarm`` and ``entrypoint`` run the way ``livekit-agents`` runs them: one
+``prewarm`` per worker process, then one ``entrypoint`` per room.
+
+Run with ``python -m pytest tests``.
+"""
+import asyncio
+import importlib
+import json
+import sys
+import types
+from collections import defaultdict
+from typing import Optional
+
+import pytest
+from prometheus_client import REGISTRY
+
+
+class FakeVAD:
+    loads = 0
+
+    @classmethod
+    def load(cls):
+        cls.loads += 1
+        return cls()
+
+
+class FakeSession:
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.handlers = defaultdict(list)
+        self.starts = 0
+        FakeSession.instances.append(self)
+
+    def on(self, event, handler):
+        self.handlers[event].append(handler)
+
+    def emit(self, event, payload):
+        for handler in self.handlers[event]:
+            handler(payload)
+
+    async def start(self, room, agent, room_input_options=None):
+        self.starts += 1
+
+    async def generate_reply(self, instructions=None):
+        self.emit("agent_state_changed", types.SimpleNamespace(new_state="thinking"))
+        self.emit("agent_state_changed", types.SimpleNamespace(new_state="speaking"))
+
+
+class FakeJobProcess:
+    def __init__(self):
+        self.userdata = {}
+
+
+class FakeJobContext:
+    def __init__(self, proc, room_name):
+        self.proc = proc
+        self.room = types.SimpleNamespace(name=room_name)
+        self.job = types.SimpleNamespace(id=f"job-{room_name}")
+        self.shutdown_callbacks = []
+
+    async def connect(self):
+        pass
+
+    async def wait_for_participant(self):
+        return types.SimpleNamespace(
+            identity="user_alice",
+            metadata=json.dumps({"tenant_id": "tenant-1", "user_id": "1"})
+        )
+
+    def add_shutdown_callback(self, callback):
+        self.shutdown_callbacks.append(callback)
+
+
+class FakeSupport:
+    def __init__(self, vector_store):
+        self.vector_store = vector_store
+
+    async def aclose(self):
+        pass
+
+
+def _fake_livekit_modules():
+    plugin = lambda **classes: types.SimpleNamespace(**classes)
+    anything = lambda *args, **kwargs: types.SimpleNamespace(args=args, kwargs=kwargs)
+
+    llm = types.ModuleType("livekit.agents.llm")
+    llm.LLM = type("LLM", (), {"__init__": lambda self: None})
+    llm.LLMStream = type("LLMStream", (), {})
+    llm.ChatContext = llm.ToolChoice = object
+
+    agents = types.ModuleType("livekit.agents")
+    agents.Agent = type("Agent", (), {"__init__": lambda self, instructions: None})
+    agents.AgentSession = FakeSession
+    agents.JobContext = FakeJobContext
+    agents.JobProcess = FakeJobProcess
+    agents.RoomInputOptions = anything
+    agents.WorkerOptions = anything
+    agents.cli = types.SimpleNamespace(run_app=anything)
+    agents.llm = llm
+    agents.metrics = types.SimpleNamespace(EOUMetrics=(), LLMMetrics=(), TTSMetrics=())
+    agents.DEFAULT_API_CONNECT_OPTIONS = agents.NOT_GIVEN = None
+    agents.APIConnectOptions = object
+    agents.NotGivenOr = Optional
+
+    plugins = types.ModuleType("livekit.plugins")
+    plugins.silero = plugin(VAD=FakeVAD)
+    plugins.noise_cancellation = plugin(BVC=anything)
+    plugins.deepgram = plugin(STT=anything)
+    plugins.cartesia = plugin(TTS=anything)
+    plugins.openai = plugin(LLM=anything)
+    multilingual = types.ModuleType("livekit.plugins.turn_detector.multilingual")
+    multilingual.MultilingualModel = anything
+
+    return {
+        "livekit": types.ModuleType("livekit"),
+        "livekit.agents": agents,
+        "livekit.agents.llm": llm,
+        "livekit.plugins": plugins,
+        "livekit.plugins.turn_detector": types.ModuleType("livekit.plugins.turn_detector"),
+        "livekit.plugins.turn_detector.multilingual": multilingual,
+    }
+
+
+@pytest.fixture
+def livekit_agent(monkeypatch):
+    for name, module in _fake_livekit_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    for name in ("app.agent.livekit_agent", "app.agent.livekit_llm", "app.agent.voice_metrics"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    module = importlib.import_module("app.agent.livekit_agent")
+
+    async def initialize_graph():
+        pass
+
+    monkeypatch.setattr(module, "MultiTenantVectorStore", object)
+    monkeypatch.setattr(module, "AISupport", FakeSupport)
+    monkeypatch.setattr(module, "initialize_graph", initialize_graph)
+    FakeVAD.loads = 0
+    FakeSession.instances = []
+    return module
+
+
+def _greetings_observed() -> float:
+    return REGISTRY.get_sample_value("voice_join_to_greeting_seconds_count") or 0.0
+
+
+def test_worker_process_serves_rooms(livekit_agent):
+    greetings_before = _greetings_observed()
+    proc = FakeJobProcess()
+    livekit_agent.prewarm(proc)
+
+    async def run_jobs():
+        for room_name in ("room-a", "room-b"):
+            await livekit_agent.entrypoint(FakeJobContext(proc, room_name))
+        # Let the background AISupport creation finish before the loop closes
+        await asyncio.gather(*(session.kwargs["llm"].support for session in FakeSession.instances))
+
+    asyncio.run(run_jobs())
+
+    assert FakeVAD.loads == 1
+    assert len(FakeSession.instances) == 2
+    for session in FakeSession.instances:
+        assert session.kwargs["vad"] is proc.userdata["vad"]
+        assert session.starts == 1
+    assert _greetings_observed() - greetings_before == 2
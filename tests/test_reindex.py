@@ -0,0 +1,80 @@
+"""Collection reindexing against an in-process Qdrant.
+
+``app.tools.reindex`` runs on a ``:memory:`` client here, including a run that
+fails part-way and is resumed from its checkpoint file.
+
+Run with ``python -m pytest tests``.
+"""
+import json
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+from app.tools.reindex import reindex
+
+POINTS = 250
+BATCH_SIZE = 32
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name="source",
+        vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE)
+    )
+    client.upsert(
+        collection_name="source",
+        points=[
+            models.PointStruct(
+                id=point_id,
+                vector=[1.0, float(point_id), 0.5, 0.25],
+                payload={"user_message": f"question {point_id}", "assistant_message": "answer", "timestamp": point_id}
+            )
+            for point_id in range(1, POINTS + 1)
+        ]
+    )
+    return client
+
+
+def _count(client: QdrantClient, collection_name: str) -> int:
+    return client.count(collection_name, exact=True).count
+
+
+def test_reindex_copies_every_point(client, tmp_path):
+    report = reindex(client, "source", "target", batch_size=BATCH_SIZE, checkpoint=tmp_path / "progress.json")
+
+    assert report.read == report.written == POINTS
+    assert _count(client, "target") == POINTS
+    copied = client.retrieve("target", ids=[7], with_payload=True, with_vectors=True)[0]
+    assert copied.payload["user_message"] == "question 7"
+    assert json.loads((tmp_path / "progress.json").read_text())["done"] is True
+
+
+def test_interrupted_reindex_resumes_from_checkpoint(client, tmp_path, monkeypatch):
+    checkpoint = tmp_path / "progress.json"
+    upsert = client.upsert
+    calls = []
+
+    def failing_upsert(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 3:
+            raise ConnectionError("Qdrant went away")
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(client, "upsert", failing_upsert)
+    with pytest.raises(ConnectionError):
+        reindex(client, "source", "target", batch_size=BATCH_SIZE, workers=1, checkpoint=checkpoint)
+
+    saved = json.loads(checkpoint.read_text())
+    assert not saved["done"]
+    assert 0 < saved["read"] < POINTS
+    assert _count(client, "target") < POINTS
+
+    monkeypatch.setattr(client, "upsert", upsert)
+    report = reindex(client, "source", "target", batch_size=BATCH_SIZE, workers=1, checkpoint=checkpoint)
+
+    assert report.read == POINTS
+    assert _count(client, "target") == POINTS
+    # A finished checkpoint makes another run a no-op
+    assert reindex(client, "source", "target", checkpoint=checkpoint).read == POINTS